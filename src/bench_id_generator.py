@@ -0,0 +1,50 @@
+"""Benchmark for the ID generation of the mm2nw project.
+
+Compare the linear probe of create_id() with the Novel's ID generators.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from time import perf_counter
+from pywriter.model.id_generator import create_id
+from pywriter.model.novel import Novel
+from pywriter.model.scene import Scene
+
+SIZES = (1000, 10000, 100000)
+MAX_LINEAR_SIZE = 10000
+# create_id() is quadratic; 100k scenes would take minutes.
+
+
+def fill_linear(size):
+    scenes = {}
+    for __ in range(size):
+        scenes[create_id(scenes)] = Scene()
+    return scenes
+
+
+def fill_novel(size):
+    novel = Novel()
+    for __ in range(size):
+        novel.scenes[novel.create_id(novel.scenes)] = Scene()
+    return novel.scenes
+
+
+def measure(function, size):
+    start = perf_counter()
+    function(size)
+    return perf_counter() - start
+
+
+def run():
+    print(f'{"scenes":>10} {"create_id [s]":>15} {"Novel.create_id [s]":>20}')
+    for size in SIZES:
+        if size <= MAX_LINEAR_SIZE:
+            linear = f'{measure(fill_linear, size):15.3f}'
+        else:
+            linear = f'{"(skipped)":>15}'
+        print(f'{size:>10} {linear} {measure(fill_novel, size):20.3f}')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,232 @@
+"""Benchmark suite for the mm2nw project.
+
+Generate a synthetic FreeMind mindmap and time reading the mindmap,
+writing the novelWriter project, and reading the project back.
+Append the results to a JSON file, so that they can be compared across commits.
+
+Usage: python bench_mm2nw.py [--parts N] [--chapters N] [--scenes N] ... [--output FILE]
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import tracemalloc
+from datetime import datetime
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import perf_counter
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+import mm2nw_
+from mm2yw7lib.mm_file import MmFile
+from yw2nwlib.nwx_file import NwxFile
+from pywriter.model.novel import Novel
+
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit',
+         'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore')
+
+
+def generate_note(size, seed, rich):
+    """Return the XML of a FreeMind note with size words."""
+    words = [WORDS[(seed + i * 7) % len(WORDS)] for i in range(size)]
+    if rich:
+        paragraphs = []
+        for start in range(0, size, 40):
+            paragraph = words[start:start + 40]
+            if len(paragraph) > 4:
+                paragraph[1] = f'<b>{paragraph[1]}</b>'
+                paragraph[3] = f'<i>{paragraph[3]}</i>'
+            paragraphs.append(f'<p>\n{" ".join(paragraph)}\n</p>')
+        body = '\n'.join(paragraphs)
+    else:
+        body = escape(' '.join(words))
+    return f'<richcontent TYPE="NOTE"><html>\n<head>\n</head>\n<body>\n{body}\n</body>\n</html></richcontent>\n'
+
+
+def generate_mindmap(filePath, parts=2, chapters=10, scenes=10, characters=20, locations=20, items=20,
+                     noteSize=200, rich=True):
+    """Write a synthetic FreeMind mindmap.
+
+    Positional arguments:
+        filePath -- str: path of the mindmap to be written.
+
+    Optional arguments:
+        parts -- int: number of parts.
+        chapters -- int: number of chapters per part.
+        scenes -- int: number of scenes per chapter.
+        characters, locations, items -- int: number of world elements of each type.
+        noteSize -- int: number of words per scene note.
+        rich -- bool: if True, use HTML paragraphs and emphasis in the notes.
+    """
+    lines = []
+    nodeCount = 0
+
+    def start_node(title, icon=None, noteWords=0):
+        nonlocal nodeCount
+        nodeCount += 1
+        lines.append(f'<node CREATED="1685823953355" ID="ID_{nodeCount}" MODIFIED="1685906303848" TEXT={quoteattr(title)}>\n')
+        if icon is not None:
+            lines.append(f'<icon BUILTIN="{icon}"/>\n')
+        if noteWords:
+            lines.append(generate_note(noteWords, nodeCount, rich))
+
+    def end_node():
+        lines.append('</node>\n')
+
+    lines.append('<map version="1.0.1">\n')
+    start_node('Synthetic novel', noteWords=20)
+    for p in range(parts):
+        start_node(f'Part {p + 1}', noteWords=20)
+        for c in range(chapters):
+            start_node(f'Chapter {p + 1}.{c + 1}', noteWords=20)
+            for s in range(scenes):
+                start_node(f'Scene {p + 1}.{c + 1}.{s + 1}', noteWords=noteSize)
+                end_node()
+            end_node()
+        end_node()
+    for title, icon, count in (
+            ('Characters', mm2nw_.SETTINGS['main_characters_icon'], characters),
+            ('Locations', mm2nw_.SETTINGS['locations_icon'], locations),
+            ('Items', mm2nw_.SETTINGS['items_icon'], items),
+            ):
+        start_node(title, icon)
+        for i in range(count):
+            start_node(f'{title[:-1]} {i + 1}', noteWords=50)
+            end_node()
+        end_node()
+    end_node()
+    lines.append('</map>\n')
+    with open(filePath, 'w', encoding='utf-8') as f:
+        f.write(''.join(lines))
+    return nodeCount
+
+
+def get_kwargs():
+    kwargs = {'suffix': mm2nw_.SUFFIX}
+    kwargs.update(mm2nw_.SETTINGS)
+    kwargs.update(mm2nw_.OPTIONS)
+    return kwargs
+
+
+def read_mindmap(mmPath, kwargs):
+    mmFile = MmFile(mmPath, **kwargs)
+    mmFile.novel = Novel()
+    mmFile.read()
+    return mmFile.novel
+
+
+def write_project(nwxPath, novel, kwargs):
+    rmtree(os.path.dirname(nwxPath), ignore_errors=True)
+    os.makedirs(f'{os.path.dirname(nwxPath)}{NwxFile.CONTENT_DIR}')
+    nwxFile = NwxFile(nwxPath, **kwargs)
+    nwxFile.novel = novel
+    nwxFile.write()
+
+
+def read_project(nwxPath, kwargs):
+    nwxFile = NwxFile(nwxPath, **kwargs)
+    nwxFile.novel = Novel()
+    nwxFile.read()
+    return nwxFile.novel
+
+
+def measure(function, *args, repeat=3):
+    """Return the best time in seconds and the peak memory in bytes."""
+    times = []
+    for __ in range(repeat):
+        start = perf_counter()
+        function(*args)
+        times.append(perf_counter() - start)
+    tracemalloc.start()
+    function(*args)
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except:
+        return None
+
+
+def run(params, outputPath, repeat=3):
+    workDir = mkdtemp()
+    try:
+        mmPath = f'{workDir}/bench.mm'
+        nwxPath = f'{workDir}/bench.nw/nwProject.nwx'
+        nodes = generate_mindmap(mmPath, **params)
+        kwargs = get_kwargs()
+        novel = read_mindmap(mmPath, kwargs)
+        results = {}
+        results['MmFile.read'] = measure(read_mindmap, mmPath, kwargs, repeat=repeat)
+        results['NwxFile.write'] = measure(write_project, nwxPath, novel, kwargs, repeat=repeat)
+        results['NwxFile.read'] = measure(read_project, nwxPath, kwargs, repeat=repeat)
+        mmSize = os.path.getsize(mmPath)
+    finally:
+        rmtree(workDir, ignore_errors=True)
+
+    record = dict(
+        commit=get_commit(),
+        timeStamp=datetime.now().replace(microsecond=0).isoformat(sep=' '),
+        python=sys.version.split()[0],
+        params=params,
+        nodes=nodes,
+        mindmapBytes=mmSize,
+        results={phase: {'seconds': round(seconds, 6), 'peakBytes': peak} for phase, (seconds, peak) in results.items()},
+        )
+    try:
+        with open(outputPath, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = []
+    previous = None
+    for entry in history:
+        if entry.get('params') == params:
+            previous = entry
+    history.append(record)
+    with open(outputPath, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+
+    print(f'{nodes} nodes, {mmSize / 1e6:.1f} MB mindmap')
+    print(f'{"phase":<15} {"time [s]":>10} {"peak [MB]":>10} {"prev. time [s]":>15}')
+    for phase, result in record['results'].items():
+        if previous is not None and phase in previous['results']:
+            prevTime = f'{previous["results"][phase]["seconds"]:15.3f}'
+        else:
+            prevTime = f'{"-":>15}'
+        print(f'{phase:<15} {result["seconds"]:10.3f} {result["peakBytes"] / 1e6:10.1f} {prevTime}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark for the mm2nw converter')
+    parser.add_argument('--parts', type=int, default=2)
+    parser.add_argument('--chapters', type=int, default=10, help='chapters per part')
+    parser.add_argument('--scenes', type=int, default=10, help='scenes per chapter')
+    parser.add_argument('--characters', type=int, default=20)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--note-size', type=int, default=200, help='words per scene note')
+    parser.add_argument('--plain', action='store_true', help='use plain text instead of rich HTML notes')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per phase')
+    parser.add_argument('--output', default='bench_mm2nw.json', help='JSON file the results are appended to')
+    args = parser.parse_args()
+    params = dict(
+        parts=args.parts,
+        chapters=args.chapters,
+        scenes=args.scenes,
+        characters=args.characters,
+        locations=args.locations,
+        items=args.items,
+        noteSize=args.note_size,
+        rich=not args.plain,
+        )
+    run(params, args.output, args.repeat)
@@ -0,0 +1,91 @@
+"""Micro-benchmark for the yWriter to Markdown conversion of the mm2nw project.
+
+Convert a synthetic manuscript of one million words, comparing the former 
+conversion with the precompiled translator of the NwdNovelFile class.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import random
+import re
+from time import perf_counter
+from yw2nwlib.nwx_file import NwxFile
+from yw2nwlib.nw_item_v1_5 import NwItemV15
+from yw2nwlib.nwd_novel_file import NwdNovelFile
+import mm2nw_
+
+WORDS = 1000000
+SCENES = 500
+WORDS_PER_SCENE = WORDS // SCENES
+PLAIN_WORDS = ('the', 'garden', 'was', 'quiet', 'and', 'still', 'Pyramus', 'said', 'nothing', 'behind',
+               'the', 'walls', 'of', 'Babylon', 'where', 'the', 'moon', 'rose', 'and', 'Thisbe', 'waited', '--')
+MARKUP_WORDS = ('[i]whispered[/i]', '[b]lion[/b]', '[s]veil[/s]', '[h1]mulberry[/h1]', '[i] softly [/i]', 'night.\n')
+MARKUP_RATE = 0.03
+# Fraction of words with markup or a line break.
+
+
+def convert_former(text, doubleLinebreaks=True):
+    """Return text, converted like NwdNovelFile._convert_from_yw() did before."""
+    MD_REPLACEMENTS = [
+        ('[i] ', ' [i]'),
+        ('[b] ', ' [b]'),
+        ('[s] ', ' [s]'),
+        (' [/i]', '[/i] '),
+        (' [/b]', '[/b] '),
+        (' [/s]', '[/s] '),
+        ('[i]', '_'),
+        ('[/i]', '_'),
+        ('[b]', '**'),
+        ('[/b]', '**'),
+        ('[s]', '~~'),
+        ('[/s]', '~~'),
+        ('  ', ' '),
+    ]
+    if doubleLinebreaks:
+        MD_REPLACEMENTS.insert(0, ['\n', '\n\n'])
+    for yw, md in MD_REPLACEMENTS:
+        text = text.replace(yw, md)
+    return re.sub('\[\/*[h|c|r|u]\d*\]', '', text)
+
+
+def create_manuscript():
+    random.seed(0)
+    scenes = []
+    for __ in range(SCENES):
+        words = []
+        for __ in range(WORDS_PER_SCENE):
+            if random.random() < MARKUP_RATE:
+                words.append(random.choice(MARKUP_WORDS))
+            else:
+                words.append(random.choice(PLAIN_WORDS))
+        scenes.append(' '.join(words))
+    return scenes
+
+
+def run():
+    kwargs = {}
+    kwargs.update(mm2nw_.SETTINGS)
+    kwargs.update(mm2nw_.OPTIONS)
+    prj = NwxFile('bench.nw/nwProject.nwx', **kwargs)
+    nwItem = NwItemV15()
+    nwItem.nwHandle = '0000000000000'
+    nwdFile = NwdNovelFile(prj, nwItem)
+    scenes = create_manuscript()
+
+    start = perf_counter()
+    expected = [convert_former(text) for text in scenes]
+    former = perf_counter() - start
+
+    start = perf_counter()
+    result = [nwdFile._convert_from_yw(text) for text in scenes]
+    precompiled = perf_counter() - start
+
+    assert result == expected
+    print(f'{WORDS} words in {SCENES} scenes')
+    print(f'former conversion:      {former:8.3f} s')
+    print(f'precompiled translator: {precompiled:8.3f} s')
+
+
+if __name__ == '__main__':
+    run()
@@ -2,15 +2,24 @@
 """Convert FreeMind to novelWriter
 
 Version @release
-Requires Python 3.6+
+Requires Python 3.7+
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/mm2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import argparse
+import json
+import sys
+import cProfile
+import pstats
+import tracemalloc
 from pywriter.ui.ui import Ui
 from pywriter.ui.ui_cmd import UiCmd
 from mm2nwlib.mm_nw_converter import MmNwConverter
+from mm2nwlib.mm_nw_batch import MmNwBatch
+from mm2nwlib.mm_nw_batch import collect_source_paths
+from mm2nwlib.mm_nw_watcher import MmNwWatcher
+from mm2nwlib.mm_nw_server import MmNwServer
 
 SUFFIX = ''
 APPNAME = 'mm2nw'
@@ -41,6 +50,16 @@ OPTIONS = dict(
     export_items=True,
     has_normal_parts=True,
     double_linebreaks=True,
+    stream_mindmap=False,
+    fast_handles=False,
+    write_threads=1,
+    incremental=False,
+    skip_unchanged=False,
+    node_id_handles=False,
+    archive=False,
+    staged_write=False,
+    fsync=False,
+    dry_run=False,
 )
 
 
@@ -59,15 +78,118 @@ def main(sourcePath, silentMode=True):
     ui.start()
 
 
+def profile(sourcePath):
+    """Convert a mindmap, printing timings, counters, and cProfile/tracemalloc statistics."""
+    kwargs = {'suffix': SUFFIX}
+    kwargs.update(SETTINGS)
+    kwargs.update(OPTIONS)
+    converter = MmNwConverter()
+    converter.ui = UiCmd('Converter between FreeMind and novelWriter @release')
+    converter.ui.metricsSink = lambda metrics: print(json.dumps(metrics, indent=2))
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    converter.run(sourcePath, **kwargs)
+    profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(25)
+    print(f'Peak memory: {peak / 1e6:.1f} MB')
+    for statistic in snapshot.statistics('lineno')[:10]:
+        print(statistic)
+
+
+def batch(sourcePatterns, manifestPath=None, processes=None):
+    """Convert many mindmaps and return a summary dictionary."""
+    kwargs = {'suffix': SUFFIX}
+    kwargs.update(SETTINGS)
+    kwargs.update(OPTIONS)
+    sourcePaths = collect_source_paths(sourcePatterns, manifestPath)
+    converter = MmNwBatch(processes)
+    return converter.run(sourcePaths, **kwargs)
+
+
+def watch(sourcePatterns, interval=1.0, silentMode=True):
+    """Re-convert mindmaps whenever they are saved, until interrupted."""
+    kwargs = {'suffix': SUFFIX}
+    kwargs.update(SETTINGS)
+    kwargs.update(OPTIONS)
+    converter = MmNwConverter()
+    converter.ui = Ui('')
+    watcher = MmNwWatcher(converter, collect_source_paths(sourcePatterns), interval=interval)
+    watcher.quiet = silentMode
+    watcher.run(**kwargs)
+
+
+def serve(port=8765, processes=None):
+    """Run a local conversion service until interrupted."""
+    kwargs = {'suffix': SUFFIX}
+    kwargs.update(SETTINGS)
+    kwargs.update(OPTIONS)
+    server = MmNwServer(port=port, processes=processes, **kwargs)
+    print(f'Conversion service listening on http://{server.address[0]}:{server.address[1]}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
         description='Converter between FreeMind and novelWriter',
         epilog='')
     parser.add_argument('sourcePath',
                         metavar='Sourcefile',
-                        help='The path of the .mm file.')
+                        nargs='*',
+                        help='The path of the .mm file. In batch mode, any number of paths or glob patterns.')
     parser.add_argument('--silent',
                         action="store_true",
                         help='suppress error messages and the request to confirm overwriting')
+    parser.add_argument('--batch',
+                        action="store_true",
+                        help='convert all given files and print a JSON summary')
+    parser.add_argument('--manifest',
+                        metavar='Manifest',
+                        help='batch mode: a text file listing one path or glob pattern per line')
+    parser.add_argument('--processes',
+                        type=int,
+                        help='batch or service mode: number of worker processes (default: number of CPUs)')
+    parser.add_argument('--watch',
+                        action="store_true",
+                        help='re-convert the given files whenever they are saved, until interrupted')
+    parser.add_argument('--interval',
+                        type=float,
+                        default=1.0,
+                        help='watch mode: polling interval in seconds (default: 1.0)')
+    parser.add_argument('--serve',
+                        action="store_true",
+                        help='run a local conversion service (POST /convert, GET /status)')
+    parser.add_argument('--port',
+                        type=int,
+                        default=8765,
+                        help='service mode: port on the loopback interface (default: 8765)')
+    parser.add_argument('--profile',
+                        action="store_true",
+                        help='print phase timings, counters, and cProfile/tracemalloc statistics')
+    parser.add_argument('--dry-run',
+                        action="store_true",
+                        help='convert in memory without writing any files')
     args = parser.parse_args()
-    main(args.sourcePath, args.silent)
+    if args.dry_run:
+        OPTIONS['dry_run'] = True
+    if args.profile and args.sourcePath:
+        profile(args.sourcePath[0])
+    elif args.serve:
+        serve(args.port, args.processes)
+    elif args.watch and args.sourcePath:
+        watch(args.sourcePath, args.interval, args.silent)
+    elif args.batch or args.manifest or len(args.sourcePath) > 1:
+        summary = batch(args.sourcePath, args.manifest, args.processes)
+        print(json.dumps(summary, indent=2))
+        if summary['failed']:
+            sys.exit(1)
+    elif args.sourcePath:
+        main(args.sourcePath[0], args.silent)
+    else:
+        parser.error('the following arguments are required: Sourcefile')
@@ -0,0 +1,157 @@
+"""Provide a class for converting many FreeMind mindmaps in one process.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pywriter.pywriter_globals import *
+from pywriter.ui.ui import Ui
+from mm2nwlib.mm_nw_converter import MmNwConverter
+
+_converter = None
+# MmNwConverter instance, reused for all conversions within a worker process.
+
+_converterKwargs = {}
+# Keyword arguments passed to the converter's run() method.
+
+
+def init_converter(kwargs):
+    """Create the converter instance of the current process.
+
+    Positional arguments:
+        kwargs -- keyword arguments to be passed to MmNwConverter.run().
+    """
+    global _converter
+    global _converterKwargs
+    _converter = MmNwConverter()
+    _converter.ui = Ui('')
+    _converterKwargs = kwargs
+
+
+def convert_file(sourcePath):
+    """Convert a single mindmap using the current process' converter instance.
+
+    Positional arguments:
+        sourcePath -- str: the source file path.
+
+    Return a dictionary with the conversion status and timing.
+    """
+    startTime = time.perf_counter()
+    try:
+        _converter.run(sourcePath, **_converterKwargs)
+        message = _converter.ui.infoHowText
+    except Exception as ex:
+        _converter.newFile = None
+        message = f'FAIL: {str(ex)}'
+    seconds = time.perf_counter() - startTime
+    if _converter.newFile is None:
+        status = 'failed'
+        targetPath = None
+    else:
+        status = 'ok'
+        targetPath = norm_path(_converter.newFile)
+    return dict(
+        source=norm_path(sourcePath),
+        target=targetPath,
+        status=status,
+        message=message,
+        seconds=round(seconds, 6),
+        )
+
+
+def collect_source_paths(patterns, manifestPath=None):
+    """Return a list of source file paths without duplicates.
+
+    Positional arguments:
+        patterns -- iterable of file paths or glob patterns.
+
+    Optional arguments:
+        manifestPath -- str: path of a text file listing one path or glob pattern per line.
+
+    Blank lines and lines starting with '#' in the manifest are ignored.
+    Relative paths in the manifest refer to the manifest's directory.
+    Patterns that match no file are kept, so that they show up as failed.
+    Raise the "Error" exception if the manifest cannot be read.
+    """
+    patterns = list(patterns)
+    if manifestPath is not None:
+        try:
+            with open(manifestPath, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+        except OSError:
+            raise Error(f'Can not read "{norm_path(manifestPath)}".')
+
+        manifestDir = os.path.dirname(manifestPath)
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                patterns.append(os.path.join(manifestDir, line))
+    sourcePaths = []
+    knownPaths = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+        for sourcePath in matches:
+            if not sourcePath in knownPaths:
+                knownPaths.add(sourcePath)
+                sourcePaths.append(sourcePath)
+    return sourcePaths
+
+
+class MmNwBatch:
+    """A class for converting many FreeMind mindmaps in one process.
+
+    Public methods:
+        run(sourcePaths, **kwargs) -- Convert all source files and return a summary.
+
+    Public instance variables:
+        processes -- int: number of worker processes. If 1, convert in the current process.
+    """
+
+    def __init__(self, processes=None):
+        """Set the number of worker processes.
+
+        Optional arguments:
+            processes -- int: number of worker processes. Default: number of CPUs.
+        """
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self.processes = processes
+
+    def run(self, sourcePaths, **kwargs):
+        """Convert all source files and return a summary.
+
+        Positional arguments:
+            sourcePaths -- list of source file paths.
+
+        Required keyword arguments:
+            (the MmNwConverter.run() keyword arguments)
+
+        Each process creates one converter instance
+        and reuses it for all the files assigned to it.
+        Return a dictionary with per-file status and timings.
+        """
+        startTime = time.perf_counter()
+        processes = max(1, min(self.processes, len(sourcePaths)))
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes, initializer=init_converter, initargs=(kwargs,)) as executor:
+                results = list(executor.map(convert_file, sourcePaths))
+        else:
+            init_converter(kwargs)
+            results = [convert_file(sourcePath) for sourcePath in sourcePaths]
+        failed = len([result for result in results if result['status'] != 'ok'])
+        return dict(
+            files=results,
+            total=len(results),
+            succeeded=len(results) - failed,
+            failed=failed,
+            processes=processes,
+            seconds=round(time.perf_counter() - startTime, 6),
+            )
+
@@ -5,11 +5,16 @@ For further information see https://github.com/peter88213/mm2yw7
 Published under the MIT License (https://opensourceFile.org/licenses/mit-license.php)
 """
 import os
+from shutil import copy2
+from shutil import rmtree
+from tempfile import mkdtemp
 from pywriter.pywriter_globals import *
 from pywriter.converter.yw_cnv_ui import YwCnvUi
 from yw2nwlib.nwx_file import NwxFile
+from yw2nwlib.nwx_file import sync_dir
 from mm2yw7lib.mm_file import MmFile
 from pywriter.model.novel import Novel
+from pywriter.ui.metrics import Metrics
 
 
 class MmNwConverter(YwCnvUi):
@@ -17,6 +22,9 @@ class MmNwConverter(YwCnvUi):
 
     Public methods:
         run(sourcePath, **kwargs) -- Create source and target objects and run conversion.
+
+    Public instance variables:
+        memoryFiles -- dict: after a dry run, (key: file path, value: text of the file not written), otherwise None.
     """
 
     def run(self, sourcePath, **kwargs):
@@ -27,8 +35,21 @@ class MmNwConverter(YwCnvUi):
         
         Required keyword arguments: 
             (none)
+
+        Optional keyword arguments:
+            incremental -- bool: if True, update a project created in incremental mode in place.
+            skip_unchanged -- bool: if True, update a project created in skip_unchanged mode in place,
+                                    writing only the changed .nwd files.
+            archive -- bool: if True, write the project as a single zip archive.
+            staged_write -- bool: if True, write the project into a temporary sibling directory
+                                  and rename it when complete.
+            fsync -- bool: if True, flush the written files and directories to the storage device.
+            dry_run -- bool: if True, convert in memory without writing anything; see memoryFiles.
+
+        Pass the timings and counters of the conversion to the UI's metrics sink.
         """
         self.newFile = None
+        self.memoryFiles = None
 
         if not os.path.isfile(sourcePath):
             self.ui.set_info_how(f'!File "{norm_path(sourcePath)}" not found.')
@@ -47,37 +68,159 @@ class MmNwConverter(YwCnvUi):
                 self.ui.set_info_how(f'!Please exit novelWriter.')
                 return
 
-            try:
-                os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
-            except FileExistsError:
-                extension = '.bak'
-                i = 0
-                while os.path.isdir(f'{prjDir}{extension}'):
-                    extension = f'.bk{i:03}'
-                    i += 1
-                    if i > 999:
-                        self.ui.set_info_how(f'!Unable to back up the project.')
-                        return
-
-                os.replace(prjDir, f'{prjDir}{extension}')
-                self.ui.set_info_what(f'Backup folder "{norm_path(prjDir)}{extension}" saved.')
-                os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
-            targetFile = NwxFile(f'{prjDir}/nwProject.nwx', **kwargs)
+            stagingDir = None
+            dryRun = kwargs.get('dry_run', False)
+            if dryRun:
+                # Leave the file system untouched.
+                kwargs = dict(kwargs, in_memory=True)
+            elif kwargs.get('archive', False):
+                # Write a zip archive instead of a project directory.
+                pass
+            elif ((kwargs.get('incremental', False) and os.path.isfile(f'{prjDir}/{NwxFile.STATE_FILE}'))
+                  or (kwargs.get('skip_unchanged', False) and os.path.isfile(f'{prjDir}/{NwxFile.HASH_FILE}'))):
+                # Update the project in place.
+                os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}', exist_ok=True)
+            elif kwargs.get('staged_write', False):
+                # Build the complete project in a sibling directory on the same file system.
+                # Create it within a private temporary directory, so that it gets the default permissions.
+                stagingDir = mkdtemp(prefix=f'.{title}.nw.', dir=srcDir)
+                os.makedirs(f'{stagingDir}/{title}.nw{NwxFile.CONTENT_DIR}')
+            elif not self._create_project_dir(prjDir):
+                return
+            if stagingDir is None:
+                targetFile = NwxFile(f'{prjDir}/nwProject.nwx', **kwargs)
+            else:
+                targetFile = NwxFile(f'{stagingDir}/{title}.nw/nwProject.nwx', **kwargs)
+            metrics = Metrics()
+            sourceFile.metrics = metrics
+            targetFile.metrics = metrics
             self.ui.set_info_what(
-                _('Create a novelWriter project from {0}\nNew project: "{1}"').format(sourceFile.DESCRIPTION, norm_path(targetFile.filePath)))
+                _('Create a novelWriter project from {0}\nNew project: "{1}"').format(sourceFile.DESCRIPTION, norm_path(f'{prjDir}/nwProject.nwx')))
             try:
-                self.check(sourceFile, targetFile)
+                if not dryRun:
+                    self.check(sourceFile, targetFile)
+                    if targetFile.archivePath is not None and os.path.isfile(targetFile.archivePath):
+                        self._back_up_archive(targetFile.archivePath)
                 sourceFile.novel = Novel()
                 sourceFile.read()
                 targetFile.novel = sourceFile.novel
                 targetFile.write()
+                if stagingDir is not None:
+                    with metrics.phase('io'):
+                        self._replace_project_dir(f'{stagingDir}/{title}.nw', prjDir, kwargs.get('fsync', False))
             except Exception as ex:
                 message = f'!{str(ex)}'
                 self.newFile = None
             else:
-                message = f'{_("File written")}: "{norm_path(targetFile.filePath)}".'
-                self.newFile = targetFile.filePath
+                if targetFile.archivePath is not None:
+                    self.newFile = targetFile.archivePath
+                else:
+                    self.newFile = f'{prjDir}/nwProject.nwx'
+                if dryRun:
+                    self.memoryFiles = targetFile.memoryFiles
+                    message = f'{_("Dry run")}: "{norm_path(self.newFile)}" not written ({len(self.memoryFiles)} files).'
+                else:
+                    message = f'{_("File written")}: "{norm_path(self.newFile)}".'
             finally:
+                if stagingDir is not None:
+                    rmtree(stagingDir, ignore_errors=True)
                 self.ui.set_info_how(message)
+                self.ui.report_metrics(metrics.as_dict())
         else:
             self.ui.set_info_how(f'!File type of "{norm_path(sourcePath)}" not supported.')
+
+    def check(self, source, target):
+        """Error handling:
+        
+        - Check if source and target are correctly initialized.
+        - Ask for permission to overwrite target, or the target's archive in archive mode.
+        - Raise the "Error" exception in case of error. 
+
+        Extends the superclass method.
+        """
+        super().check(source, target)
+        if target.archivePath is not None and os.path.isfile(target.archivePath):
+            if not self._confirm_overwrite(target.archivePath):
+                raise Error(f'{_("Action canceled by user")}.')
+
+    def _back_up_archive(self, archivePath):
+        """Copy an existing project archive to a backup file.
+        
+        Positional arguments:
+            archivePath -- str: path to the project archive.
+        
+        The archive itself is replaced only when the new one is complete.
+        Raise the "Error" exception in case of error.
+        """
+        extension = '.bak'
+        i = 0
+        while os.path.isfile(f'{archivePath}{extension}'):
+            extension = f'.bk{i:03}'
+            i += 1
+            if i > 999:
+                raise Error(f'Unable to back up the project.')
+
+        try:
+            copy2(archivePath, f'{archivePath}{extension}')
+        except OSError:
+            raise Error(f'Unable to back up the project.')
+
+        self.ui.set_info_what(f'Backup file "{norm_path(archivePath)}{extension}" saved.')
+
+    def _back_up_project_dir(self, prjDir):
+        """Rename an existing project directory to a backup name.
+        
+        Positional arguments:
+            prjDir -- str: path to the project directory.
+        
+        Return True on success.
+        """
+        extension = '.bak'
+        i = 0
+        while os.path.isdir(f'{prjDir}{extension}'):
+            extension = f'.bk{i:03}'
+            i += 1
+            if i > 999:
+                return False
+
+        os.replace(prjDir, f'{prjDir}{extension}')
+        self.ui.set_info_what(f'Backup folder "{norm_path(prjDir)}{extension}" saved.')
+        return True
+
+    def _create_project_dir(self, prjDir):
+        """Create a new project directory, backing up an existing one.
+        
+        Positional arguments:
+            prjDir -- str: path to the project directory.
+        
+        Return True on success.
+        """
+        try:
+            os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
+        except FileExistsError:
+            if not self._back_up_project_dir(prjDir):
+                self.ui.set_info_how(f'!Unable to back up the project.')
+                return False
+
+            os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
+        return True
+
+    def _replace_project_dir(self, stagingDir, prjDir, fsync=False):
+        """Move a completely written project from the staging directory to the project directory.
+        
+        Positional arguments:
+            stagingDir -- str: path to the staging directory.
+            prjDir -- str: path to the project directory.
+        
+        Optional arguments:
+            fsync -- bool: if True, flush the renamed directory entries to the storage device.
+        
+        Back up an existing project directory first.
+        Raise the "Error" exception in case of error.
+        """
+        if os.path.isdir(prjDir) and not self._back_up_project_dir(prjDir):
+            raise Error(f'Unable to back up the project.')
+
+        os.replace(stagingDir, prjDir)
+        if fsync:
+            sync_dir(os.path.dirname(os.path.abspath(prjDir)))
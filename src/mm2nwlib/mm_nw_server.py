@@ -0,0 +1,225 @@
+"""Provide a class for a local FreeMind to novelWriter conversion service.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import json
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pywriter.pywriter_globals import *
+from mm2nwlib.mm_nw_batch import init_converter
+from mm2nwlib.mm_nw_batch import convert_file
+
+
+class MmNwRequestHandler(BaseHTTPRequestHandler):
+    """HTTP request handler for the conversion service.
+
+    Requests:
+        POST /convert -- JSON body {"sources": [path, ...]} with at least one path, or {"source": path};
+                         respond with per-job status and timing.
+                         Content-Type must be application/json, so that a web page 
+                         cannot trigger conversions with a "simple" cross-origin request.
+        GET /status -- respond with the service statistics.
+    """
+
+    def do_GET(self):
+        if self.path != '/status':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        self._send_json(200, self.server.service.get_status())
+
+    def do_POST(self):
+        if self.path != '/convert':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        contentType = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if contentType != 'application/json':
+            self._send_json(415, {'error': 'Expected Content-Type: application/json.'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            if not isinstance(request, dict):
+                raise TypeError
+
+            if 'sources' in request:
+                sourcePaths = request['sources']
+                if not isinstance(sourcePaths, list) or not sourcePaths:
+                    raise TypeError
+            else:
+                sourcePaths = [request['source']]
+            if not all(isinstance(sourcePath, str) for sourcePath in sourcePaths):
+                raise TypeError
+
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {'error': 'Expected a JSON object with a "source" path or a non-empty "sources" list of paths.'})
+            return
+
+        try:
+            summary = self.server.service.convert(sourcePaths)
+        except Exception as ex:
+            self._send_json(500, {'error': f'Conversion failed: {ex!r}'})
+            return
+
+        self._send_json(200, summary)
+
+    def log_message(self, format, *args):
+        """Suppress the default logging to stderr."""
+        pass
+
+    def _send_json(self, code, data):
+        """Send a JSON response."""
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MmNwServer:
+    """A local conversion service, running the conversions in a bounded process pool.
+
+    Public methods:
+        convert(sourcePaths) -- Convert the source files and return a summary.
+        get_status() -- Return the service statistics.
+        serve_forever() -- Handle requests until shutdown() is called.
+        shutdown() -- Stop serving and terminate the worker processes.
+
+    Public instance variables:
+        address -- (host, port) tuple the service is listening on (read-only property).
+
+    The service listens on the loopback interface by default.
+    Source paths in requests refer to the local file system.
+    Jobs for the same source file, and thus for the same target, run one after another.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, processes=None, **kwargs):
+        """Start the worker processes and bind the server socket.
+
+        Optional arguments:
+            host -- str: interface to listen on.
+            port -- int: port to listen on. If 0, use any free port.
+            processes -- int: maximum number of worker processes. Default: number of CPUs.
+
+        Required keyword arguments:
+            (the MmNwConverter.run() keyword arguments)
+        """
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self._processes = processes
+        self._kwargs = kwargs
+        self._executor = ProcessPoolExecutor(max_workers=processes, initializer=init_converter, initargs=(kwargs,))
+        self._httpd = ThreadingHTTPServer((host, port), MmNwRequestHandler)
+        self._httpd.service = self
+        self._lock = threading.Lock()
+        self._sourceLocks = {}
+        # key: normalized source path, value: [Lock instance held while the source is converted,
+        # number of requests holding or waiting for the lock]. Unused entries are removed.
+        self._jobCount = 0
+        self._failedCount = 0
+        self._startTime = time.monotonic()
+
+    @property
+    def address(self):
+        return self._httpd.server_address[:2]
+
+    def convert(self, sourcePaths):
+        """Convert the source files and return a summary.
+
+        Positional arguments:
+            sourcePaths -- list of str: source file paths.
+
+        The jobs of concurrent requests share the worker processes.
+        A job waits until running jobs for the same source file are finished.
+        Each job result holds the conversion time; "seconds" includes waiting for a worker.
+        Raise an exception if the worker processes fail.
+        """
+        startTime = time.perf_counter()
+        keys = [os.path.normcase(os.path.abspath(sourcePath)) for sourcePath in sourcePaths]
+        lockKeys = sorted(set(keys))
+        with self._lock:
+            sourceLocks = []
+            for key in lockKeys:
+                entry = self._sourceLocks.setdefault(key, [threading.Lock(), 0])
+                entry[1] += 1
+                sourceLocks.append(entry[0])
+        # Acquire the locks in sorted order, so that concurrent requests cannot deadlock.
+        for sourceLock in sourceLocks:
+            sourceLock.acquire()
+        try:
+            futures = {}
+            # key: normalized source path, value: Future instance. Duplicates within a request run once.
+            for key, sourcePath in zip(keys, sourcePaths):
+                if not key in futures:
+                    futures[key] = self._submit(sourcePath)
+            results = [futures[key].result() for key in keys]
+        finally:
+            for sourceLock in sourceLocks:
+                sourceLock.release()
+            with self._lock:
+                for key in lockKeys:
+                    entry = self._sourceLocks[key]
+                    entry[1] -= 1
+                    if not entry[1]:
+                        del self._sourceLocks[key]
+        failed = len([result for result in results if result['status'] != 'ok'])
+        with self._lock:
+            self._jobCount += len(results)
+            self._failedCount += failed
+        return dict(
+            files=results,
+            total=len(results),
+            succeeded=len(results) - failed,
+            failed=failed,
+            seconds=round(time.perf_counter() - startTime, 6),
+            )
+
+    def _submit(self, sourcePath):
+        """Submit a conversion job and return its Future instance.
+        
+        Replace the worker pool, if a worker process terminated abruptly.
+        """
+        with self._lock:
+            try:
+                return self._executor.submit(convert_file, sourcePath)
+
+            except BrokenProcessPool:
+                self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(max_workers=self._processes,
+                                                     initializer=init_converter, initargs=(self._kwargs,))
+                return self._executor.submit(convert_file, sourcePath)
+
+    def get_status(self):
+        """Return the service statistics."""
+        with self._lock:
+            return dict(
+                jobs=self._jobCount,
+                failed=self._failedCount,
+                processes=self._processes,
+                uptime=round(time.monotonic() - self._startTime, 3),
+                )
+
+    def serve_forever(self):
+        """Handle requests until shutdown() is called."""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+            self._executor.shutdown()
+
+    def shutdown(self):
+        """Stop serving and terminate the worker processes.
+
+        To be called from another thread than serve_forever().
+        """
+        self._httpd.shutdown()
@@ -0,0 +1,121 @@
+"""Provide a class for re-converting FreeMind mindmaps on save.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/mm2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import time
+from pywriter.pywriter_globals import *
+
+
+class MmNwWatcher:
+    """A class for re-converting FreeMind mindmaps whenever they are saved.
+
+    Public methods:
+        poll(**kwargs) -- Check the source files once and convert the changed ones.
+        run(**kwargs) -- Poll the source files until stopped.
+        stop() -- Make run() return after the current polling cycle.
+
+    Public instance variables:
+        converter -- MmNwConverter instance, reused for all conversions.
+        sourcePaths -- list of str: paths of the watched mindmaps.
+        interval -- float: polling interval in seconds.
+        debounce -- float: time in seconds a file must remain unchanged before conversion.
+        quiet -- bool: if True, do not print a line per conversion.
+
+    The conversion runs in incremental mode, so a re-conversion writes only the changed files.
+    """
+
+    def __init__(self, converter, sourcePaths, interval=1.0, debounce=0.5):
+        """Set up the watcher.
+
+        Positional arguments:
+            converter -- MmNwConverter instance.
+            sourcePaths -- list of str: paths of the mindmaps to watch.
+
+        Optional arguments:
+            interval -- float: polling interval in seconds.
+            debounce -- float: time in seconds a file must remain unchanged before conversion.
+        """
+        self.converter = converter
+        self.sourcePaths = list(sourcePaths)
+        self.interval = interval
+        self.debounce = debounce
+        self.quiet = False
+        self._signatures = {}
+        # key: source path, value: (mtime, size) tuple of the last conversion.
+        self._pending = {}
+        # key: source path, value: (signature, time of the latest change seen).
+        self._running = False
+
+    def poll(self, **kwargs):
+        """Check the source files once and convert the changed ones.
+
+        Required keyword arguments:
+            (the MmNwConverter.run() keyword arguments)
+
+        Return a list of the converted source paths.
+        A file is converted when its modification time or size has not changed
+        for the debounce time, so that a save in progress is not read.
+        """
+        kwargs['incremental'] = True
+        converted = []
+        now = time.monotonic()
+        for sourcePath in self.sourcePaths:
+            signature = self._get_signature(sourcePath)
+            if signature is None or signature == self._signatures.get(sourcePath, None):
+                self._pending.pop(sourcePath, None)
+                continue
+
+            pendingSignature, changeTime = self._pending.get(sourcePath, (None, None))
+            if signature != pendingSignature:
+                self._pending[sourcePath] = (signature, now)
+                if self.debounce > 0:
+                    continue
+
+            elif now - changeTime < self.debounce:
+                continue
+
+            del self._pending[sourcePath]
+            self._signatures[sourcePath] = signature
+            startTime = time.perf_counter()
+            self.converter.run(sourcePath, **kwargs)
+            self._report(sourcePath, time.perf_counter() - startTime)
+            converted.append(sourcePath)
+        return converted
+
+    def run(self, **kwargs):
+        """Poll the source files until stopped.
+
+        Required keyword arguments:
+            (the MmNwConverter.run() keyword arguments)
+
+        Return on KeyboardInterrupt or after stop() is called.
+        """
+        self._running = True
+        try:
+            while self._running:
+                self.poll(**kwargs)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+        self._running = False
+
+    def stop(self):
+        """Make run() return after the current polling cycle."""
+        self._running = False
+
+    def _get_signature(self, sourcePath):
+        """Return a (mtime, size) tuple of the source file, or None if not available."""
+        try:
+            stat = os.stat(sourcePath)
+        except OSError:
+            return None
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _report(self, sourcePath, seconds):
+        """Print the result of a conversion."""
+        if not self.quiet:
+            print(f'{time.strftime("%H:%M:%S")} {norm_path(sourcePath)}: {self.converter.ui.infoHowText} ({seconds:.3f} s)')
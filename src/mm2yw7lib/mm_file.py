@@ -4,6 +4,7 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/mm2yw7
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import weakref
 import xml.etree.ElementTree as ET
 from pywriter.pywriter_globals import *
 from pywriter.file.file import File
@@ -11,7 +12,6 @@ from pywriter.model.chapter import Chapter
 from pywriter.model.scene import Scene
 from pywriter.model.character import Character
 from pywriter.model.world_element import WorldElement
-from pywriter.model.id_generator import create_id
 
 
 class MmFile(File):
@@ -22,6 +22,36 @@ class MmFile(File):
     EXTENSION = '.mm'
     DESCRIPTION = 'Mindmap'
     SUFFIX = ''
+    NODE_ID_KWVAR = 'FreeMind_ID'
+    # Key of the elements' keyword variable holding the FreeMind node ID.
+    _BRANCH_ROLES = (
+        ('main_characters_icon', 'mainCharacters'),
+        ('minor_characters_icon', 'minorCharacters'),
+        ('locations_icon', 'locations'),
+        ('items_icon', 'items'),
+    )
+    # First level node roles, in order of precedence.
+    _TYPE_ROLES = (
+        ('notes_icon', 1),
+        ('todo_icon', 2),
+    )
+    # Part, chapter, and scene types, in order of precedence.
+    _HTML_FORMATS = {
+        'b': ('[b]', '[/b]'),
+        'strong': ('[b]', '[/b]'),
+        'i': ('[i]', '[/i]'),
+        'em': ('[i]', '[/i]'),
+        's': ('[s]', '[/s]'),
+        'strike': ('[s]', '[/s]'),
+        'del': ('[s]', '[/s]'),
+    }
+    # HTML inline elements converted to yw7 formatting tags.
+    _HTML_BLOCKS = ('p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'blockquote', 'tr')
+    # HTML elements beginning a new paragraph.
+    _HTML_SKIPPED = ('head', 'script', 'style')
+    # HTML elements whose content is discarded.
+    _STUB_NOTE = 'yw7'
+    # Type of a stub's richcontent element, holding a note already converted to yw7 markup.
 
     def __init__(self, filePath, **kwargs):
         """Initialize instance variables and MmNode class variables.
@@ -37,166 +67,337 @@ class MmFile(File):
             export_characters -- bool: if True, create characters from FreeMind notes.
             export_locations -- bool: if True, create location from FreeMind notes. 
             export_items -- bool: if True, create items from FreeMind notes. 
+
+        Optional keyword arguments:
+            stream_mindmap -- bool: if True, parse the mindmap incrementally.
         
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
-        self._locationsIcon = kwargs['locations_icon']
-        self._itemsIcon = kwargs['items_icon']
-        self._mainCharactersIcon = kwargs['main_characters_icon']
-        self._minorCharactersIcon = kwargs['minor_characters_icon']
-        self._notesIcon = kwargs['notes_icon']
-        self._todoIcon = kwargs['todo_icon']
+        self._branchRoles = {}
+        # key: icon name, value: role of a first level node marked with this icon.
+        for setting, role in self._BRANCH_ROLES:
+            self._branchRoles.setdefault(kwargs[setting], role)
+        self._typeRoles = {}
+        # key: icon name, value: type of a part, chapter, or scene marked with this icon.
+        for setting, nodeType in self._TYPE_ROLES:
+            self._typeRoles.setdefault(kwargs[setting], nodeType)
+        self._iconRoles = weakref.WeakKeyDictionary()
+        # key: node element, value: (branch role, type) tuple.
         self._exportScenes = kwargs['export_scenes']
         self._exportCharacters = kwargs['export_characters']
         self._exportLocations = kwargs['export_locations']
         self._exportItems = kwargs['export_items']
         self._hasNormalParts = kwargs['has_normal_parts']
+        self._streamMindmap = kwargs.get('stream_mindmap', False)
 
     def read(self):
         """Parse the FreeMind xml file, fetching the Novel attributes.
         
+        Raise the "Error" exception in case of error. 
         Overrides the superclass method.
         """
+        if self._streamMindmap:
+            with self.metrics.phase('parse'):
+                # Parsing and building the model are interleaved.
+                self._read_incrementally()
+            return
+
         try:
-            self._tree = ET.parse(self.filePath)
+            with self.metrics.phase('parse'):
+                self._tree = ET.parse(self.filePath)
         except:
-            return f'!Can not process "{norm_path(self.filePath)}".'
-
-        root = self._tree.getroot()
-        xmlNovel = root.find('node')
-        self.novel.title = self._get_title(xmlNovel)
-        self.novel.desc = self._get_desc(xmlNovel)
-        for xmlNode in xmlNovel.findall('node'):
-            isMainCharactersNode = False
-            isMinorCharactersNode = False
-            isLocationsNode = False
-            isItemsNode = False
-            for xmlIcon in xmlNode.findall('icon'):
-                if xmlIcon.attrib.get('BUILTIN', '') == self._mainCharactersIcon:
-                    isMainCharactersNode = True
-                    break
+            raise Error(f'Can not process "{norm_path(self.filePath)}".')
 
-                if xmlIcon.attrib.get('BUILTIN', '') == self._minorCharactersIcon:
-                    isMinorCharactersNode = True
-                    break
+        with self.metrics.phase('model'):
+            root = self._tree.getroot()
+            xmlNovel = root.find('node')
+            self.novel.title = self._get_title(xmlNovel)
+            self.novel.desc = self._get_desc(xmlNovel)
+            for xmlNode in xmlNovel.findall('node'):
+                self._get_branch(xmlNode)
 
-                elif xmlIcon.attrib.get('BUILTIN', '') == self._locationsIcon:
-                    isLocationsNode = True
-                    break
+    def _read_incrementally(self):
+        """Parse the FreeMind xml file node by node, fetching the Novel attributes.
+        
+        Each node element is processed as soon as its end tag is parsed.
+        Nodes below the first level are replaced by compact stubs; 
+        first level nodes are converted and discarded with their subtrees.
+        Thus, the memory consumption does not grow with the size of the mindmap.
+        Raise the "Error" exception in case of error. 
+        """
+        xmlNodes = []
+        # Stack of the node elements currently open.
+        try:
+            with open(self.filePath, 'rb') as f:
+                for event, xmlNode in ET.iterparse(f, events=('start', 'end')):
+                    if xmlNode.tag != 'node':
+                        continue
 
-                elif xmlIcon.attrib.get('BUILTIN', '') == self._itemsIcon:
-                    isItemsNode = True
-                    break
+                    if event == 'start':
+                        xmlNodes.append(xmlNode)
+                        continue
 
-            if isMainCharactersNode:
-                if self._exportCharacters:
-                    self._get_characters(xmlNode, True)
-            elif isMinorCharactersNode:
-                if self._exportCharacters:
-                    self._get_characters(xmlNode, False)
-            elif isLocationsNode:
-                if self._exportLocations:
-                    self._get_locations(xmlNode)
-            elif isItemsNode:
-                if self._exportItems:
-                    self._get_items(xmlNode)
-            elif self._exportScenes:
-                self._get_part(xmlNode)
+                    xmlNodes.pop()
+                    level = len(xmlNodes)
+                    if level == 0:
+                        # This is the novel node.
+                        self.novel.title = self._get_title(xmlNode)
+                        self.novel.desc = self._get_desc(xmlNode)
+                        xmlNode.clear()
+                        break
+
+                    # The parser reads ahead, so later siblings may already be attached.
+                    xmlParent = xmlNodes[-1]
+                    index = len(xmlParent) - 1
+                    while xmlParent[index] is not xmlNode:
+                        index -= 1
+                    if level == 1:
+                        self._get_branch(xmlNode)
+                        del xmlParent[index]
+                    elif level <= 3:
+                        xmlParent[index] = self._get_stub(xmlNode)
+                    else:
+                        del xmlParent[index]
+        except (OSError, ET.ParseError):
+            raise Error(f'Can not process "{norm_path(self.filePath)}".')
+
+    def _get_branch(self, xmlNode):
+        """Convert a first level node with its subnodes, depending on the node's icons."""
+        role = self._classify_icons(xmlNode)[0]
+        if role == 'mainCharacters':
+            if self._exportCharacters:
+                self._get_characters(xmlNode, True)
+        elif role == 'minorCharacters':
+            if self._exportCharacters:
+                self._get_characters(xmlNode, False)
+        elif role == 'locations':
+            if self._exportLocations:
+                self._get_locations(xmlNode)
+        elif role == 'items':
+            if self._exportItems:
+                self._get_items(xmlNode)
+        elif self._exportScenes:
+            self._get_part(xmlNode)
 
     def _get_characters(self, xmlNode, isMajor):
         for xmlCharacter in xmlNode.findall('node'):
-            crId = create_id(self.novel.characters)
+            crId = self.novel.create_id(self.novel.characters)
             self.novel.characters[crId] = Character()
             self.novel.srtCharacters.append(crId)
             self.novel.characters[crId].title = self._get_title(xmlCharacter)
             self.novel.characters[crId].desc = self._get_desc(xmlCharacter)
+            self._set_node_id(self.novel.characters[crId], xmlCharacter)
             self.novel.characters[crId].isMajor = isMajor
 
+    def _convert_html(self, xmlRichcontent, markup=True):
+        """Return the text of a richcontent element, converted from HTML to yw7 markup.
+        
+        Positional arguments:
+            xmlRichcontent -- richcontent element containing HTML.
+            
+        Optional arguments:
+            markup -- bool: if True, convert bold, italics, and strikethrough, 
+                            and separate paragraphs with line breaks. 
+                            Otherwise, return the plain text as a single line.
+        
+        Walk the HTML tree once. Collapse white space as a browser does,
+        except for the line breaks of preformatted text, if markup is True.
+        List items are prefixed with a hyphen.
+        """
+        paragraphs = []
+        paragraph = []
+        preDepth = 0
+        # Number of enclosing <pre> elements.
+
+        def end_paragraph():
+            if paragraph:
+                if markup and preDepth:
+                    # Keep the lines, dropping the line break that follows the start tag.
+                    text = ''.join(paragraph)
+                    if text.startswith('\n'):
+                        text = text[1:]
+                    text = text.rstrip()
+                else:
+                    text = ' '.join(''.join(paragraph).split())
+                if text:
+                    paragraphs.append(text)
+                paragraph.clear()
+
+        def convert(xmlElement):
+            nonlocal preDepth
+            tag = xmlElement.tag
+            if tag in self._HTML_SKIPPED:
+                return
+
+            if tag in self._HTML_BLOCKS:
+                end_paragraph()
+                if tag == 'li':
+                    paragraph.append('- ')
+            formats = None
+            if markup:
+                formats = self._HTML_FORMATS.get(tag, None)
+            if formats is not None:
+                paragraph.append(formats[0])
+            if tag == 'pre':
+                preDepth += 1
+            if xmlElement.text:
+                paragraph.append(xmlElement.text)
+            for xmlChild in xmlElement:
+                convert(xmlChild)
+                if xmlChild.tail:
+                    paragraph.append(xmlChild.tail)
+            if formats is not None:
+                paragraph.append(formats[1])
+            if tag in self._HTML_BLOCKS:
+                end_paragraph()
+            if tag == 'pre':
+                preDepth -= 1
+
+        if xmlRichcontent.text:
+            paragraph.append(xmlRichcontent.text)
+        for xmlChild in xmlRichcontent:
+            convert(xmlChild)
+            if xmlChild.tail:
+                paragraph.append(xmlChild.tail)
+        end_paragraph()
+        if markup:
+            return '\n'.join(paragraphs)
+
+        return ' '.join(paragraphs)
+
     def _get_desc(self, xmlNode):
         desc = None
-        for xmlRichcontent in xmlNode.findall('richcontent'):
-            if xmlRichcontent.attrib.get('TYPE', '') == 'NOTE':
-                htmlDesc = []
-                for htmlText in xmlRichcontent.itertext():
-                    htmlDesc.append(htmlText)
-                desc = ''.join(htmlDesc).strip()
+        for xmlRichcontent in xmlNode.iterfind('richcontent'):
+            noteType = xmlRichcontent.attrib.get('TYPE', '')
+            if noteType == 'NOTE':
+                desc = self._convert_html(xmlRichcontent)
                 break
+
+            if noteType == self._STUB_NOTE:
+                desc = xmlRichcontent.text
+                break
+
         return desc
 
     def _get_items(self, xmlNode):
         for xmlItem in xmlNode.findall('node'):
-            itId = create_id(self.novel.items)
+            itId = self.novel.create_id(self.novel.items)
             self.novel.items[itId] = WorldElement()
             self.novel.srtItems.append(itId)
             self.novel.items[itId].title = self._get_title(xmlItem)
             self.novel.items[itId].desc = self._get_desc(xmlItem)
+            self._set_node_id(self.novel.items[itId], xmlItem)
 
     def _get_locations(self, xmlNode):
         for xmlLocation in xmlNode.findall('node'):
-            lcId = create_id(self.novel.locations)
+            lcId = self.novel.create_id(self.novel.locations)
             self.novel.locations[lcId] = WorldElement()
             self.novel.srtLocations.append(lcId)
             self.novel.locations[lcId].title = self._get_title(xmlLocation)
             self.novel.locations[lcId].desc = self._get_desc(xmlLocation)
+            self._set_node_id(self.novel.locations[lcId], xmlLocation)
 
     def _get_part(self, xmlNode):
         partType = self._get_type(xmlNode)
         if self._hasNormalParts or partType != 0:
             inPart = True
-            paId = create_id(self.novel.chapters)
+            paId = self.novel.create_id(self.novel.chapters)
             self.novel.chapters[paId] = Chapter()
             self.novel.srtChapters.append(paId)
             self.novel.chapters[paId].chLevel = 1
             self.novel.chapters[paId].title = self._get_title(xmlNode)
             self.novel.chapters[paId].desc = self._get_desc(xmlNode)
             self.novel.chapters[paId].chType = partType
+            self._set_node_id(self.novel.chapters[paId], xmlNode)
         else:
             partType = 0
         for xmlChapter in xmlNode.findall('node'):
-            chId = create_id(self.novel.chapters)
+            chId = self.novel.create_id(self.novel.chapters)
             self.novel.chapters[chId] = Chapter()
             self.novel.srtChapters.append(chId)
             self.novel.chapters[chId].chLevel = 0
             self.novel.chapters[chId].title = self._get_title(xmlChapter)
             self.novel.chapters[chId].desc = self._get_desc(xmlChapter)
+            self._set_node_id(self.novel.chapters[chId], xmlChapter)
             if partType == 0:
                 self.novel.chapters[chId].chType = self._get_type(xmlChapter)
             else:
                 self.novel.chapters[chId].chType = partType
             for xmlScene in xmlChapter.findall('node'):
-                scId = create_id(self.novel.scenes)
+                scId = self.novel.create_id(self.novel.scenes)
                 self.novel.scenes[scId] = Scene()
                 self.novel.chapters[chId].srtScenes.append(scId)
                 self.novel.scenes[scId].title = self._get_title(xmlScene)
                 self.novel.scenes[scId].desc = self._get_desc(xmlScene)
+                self._set_node_id(self.novel.scenes[scId], xmlScene)
                 self.novel.scenes[scId].status = 1
                 if self.novel.chapters[chId].chType != 0:
                     self.novel.scenes[scId].scType = self.novel.chapters[chId].chType
                 else:
                     self.novel.scenes[scId].scType = self._get_type(xmlScene)
 
+    def _get_stub(self, xmlNode):
+        """Return a compact replacement for a parsed node element.
+        
+        The stub holds only the node's ID, title, description, icons, and subnode stubs,
+        so it can be converted like the original element.
+        """
+        xmlStub = ET.Element('node')
+        nodeId = xmlNode.attrib.get('ID', None)
+        if nodeId is not None:
+            xmlStub.set('ID', nodeId)
+        title = self._get_title(xmlNode)
+        if title is not None:
+            xmlStub.set('TEXT', title)
+        desc = self._get_desc(xmlNode)
+        if desc is not None:
+            ET.SubElement(xmlStub, 'richcontent', TYPE=self._STUB_NOTE).text = desc
+        for xmlChild in xmlNode:
+            if xmlChild.tag in ('icon', 'node'):
+                xmlStub.append(xmlChild)
+        return xmlStub
+
+    def _set_node_id(self, element, xmlNode):
+        """Store the FreeMind node ID, if any, in the element's keyword variables."""
+        nodeId = xmlNode.attrib.get('ID', None)
+        if nodeId is not None:
+            element.kwVar[self.NODE_ID_KWVAR] = nodeId
+
     def _get_title(self, xmlNode):
         title = xmlNode.attrib.get('TEXT', None)
         if title is None:
-            for xmlRichContent in xmlNode.findall('richcontent'):
+            for xmlRichContent in xmlNode.iterfind('richcontent'):
                 if xmlRichContent.attrib.get('TYPE', '') == 'NODE':
-                    htmlTitle = []
-                    for htmlText in xmlRichContent.itertext():
-                        htmlTitle.append(htmlText)
-                    title = ''.join(htmlTitle).strip()
+                    title = self._convert_html(xmlRichContent, markup=False)
                     break
         return title
 
     def _get_type(self, xmlNode):
-        type = 0
-        for xmlIcon in xmlNode.findall('icon'):
-            if xmlIcon.attrib.get('BUILTIN', '') == self._notesIcon:
-                type = 1
-                break
+        return self._classify_icons(xmlNode)[1]
 
-            elif xmlIcon.attrib.get('BUILTIN', '') == self._todoIcon:
-                type = 2
-                break
+    def _classify_icons(self, xmlNode):
+        """Return a (branch role, type) tuple for the node, depending on its icons.
+        
+        The branch role is None for a part, otherwise it is a value of _branchRoles.
+        The type is 0 for normal, 1 for notes, 2 for todo. 
+        Scan the icons once per node element and cache the result.
+        """
+        roles = self._iconRoles.get(xmlNode, None)
+        if roles is None:
+            role = None
+            type = None
+            for xmlIcon in xmlNode.iterfind('icon'):
+                icon = xmlIcon.attrib.get('BUILTIN', '')
+                if role is None:
+                    role = self._branchRoles.get(icon, None)
+                if type is None:
+                    type = self._typeRoles.get(icon, None)
+                if role is not None and type is not None:
+                    break
 
-        return type
+            if type is None:
+                type = 0
+            roles = (role, type)
+            self._iconRoles[xmlNode] = roles
+        return roles
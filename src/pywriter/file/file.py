@@ -9,6 +9,7 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 from urllib.parse import quote
 import os
 from pywriter.pywriter_globals import *
+from pywriter.ui.metrics import Metrics
 
 
 class File:
@@ -27,6 +28,7 @@ class File:
         projectPath: str -- URL-coded path to the project directory. 
         scenesSplit: bool -- True, if a scene or chapter is split during merging.
         filePath: str -- path to the file (property with getter and setter). 
+        metrics -- Metrics instance collecting timings and counters.
 
     Public class constants:
         PRJ_KWVAR -- List of the names of the project keyword variables.
@@ -78,6 +80,7 @@ class File:
         # URL-coded path to the project directory.
 
         self.scenesSplit = False
+        self.metrics = Metrics()
         self.filePath = filePath
 
     @property
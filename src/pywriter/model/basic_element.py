@@ -15,6 +15,8 @@ class BasicElement:
         kwVar: dict -- custom keyword variables.
     """
 
+    __slots__ = ('title', 'desc', 'kwVar')
+
     def __init__(self):
         """Initialize instance variables."""
         self.title: str = None
@@ -19,6 +19,11 @@ class Chapter(BasicElement):
         srtScenes: list of str -- the chapter's sorted scene IDs.        
     """
 
+    __slots__ = (
+        'chLevel', 'chType', 'suppressChapterTitle', 'isTrash', 'suppressChapterBreak',
+        'srtScenes',
+    )
+
     def __init__(self):
         """Initialize instance variables.
         
@@ -18,3 +18,35 @@ def create_id(elements: Iterable) -> str:
         i += 1
     return str(i)
 
+
+class IdGenerator:
+    """Generator of unused IDs for a dictionary of elements.
+    
+    Public methods:
+        create_id() -- Return an unused ID for a new element.
+
+    Public instance variables:
+        elements -- dictionary containing all existing IDs.
+
+    The generator remembers where the last search for an unused ID ended.
+    As long as no elements are deleted, it returns the same IDs as the
+    create_id() function, but in amortized constant time. 
+    """
+
+    def __init__(self, elements: dict):
+        """Initialize instance variables.
+        
+        Positional arguments:
+            elements -- dictionary containing all existing IDs.
+        """
+        self.elements = elements
+        self._candidate: int = 1
+
+    def create_id(self) -> str:
+        """Return an unused ID for a new element.
+        
+        Gaps between the IDs of a pre-populated dictionary are filled first.
+        """
+        while str(self._candidate) in self.elements:
+            self._candidate += 1
+        return str(self._candidate)
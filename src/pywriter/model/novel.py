@@ -6,17 +6,27 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import locale
 import re
-from typing import Iterator, Pattern
+from concurrent.futures import ProcessPoolExecutor
+from typing import Pattern
 from pywriter.pywriter_globals import *
 from pywriter.model.basic_element import BasicElement
 from pywriter.model.chapter import Chapter
 from pywriter.model.scene import Scene
+from pywriter.model.scene import count_words
+from pywriter.model.scene import count_letters
+from pywriter.model.scene_table import SceneTable
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
+from pywriter.model.id_generator import IdGenerator
 
 LANGUAGE_TAG: Pattern = re.compile('\[lang=(.*?)\]')
 
 
+def count_words_and_letters(text: str) -> tuple:
+    """Return the number of words and the number of letters in text."""
+    return count_words(text), count_letters(text)
+
+
 class Novel(BasicElement):
     """Novel representation.
 
@@ -25,7 +35,11 @@ class Novel(BasicElement):
     of the information included in an yWriter project file).
 
     Public methods:
+        create_id(elements) -- Return an unused ID for a new element.
+        count_scenes(processes) -- Count the words and letters of all scenes.
+        get_scene_table() -- Return a columnar snapshot of the scene statistics.
         get_languages() -- Determine the languages used in the document.
+        update_languages() -- Determine the languages used in the document, rescanning only changed scenes.
         check_locale() -- Check the document's locale (language code and country code).
 
     Public instance variables:
@@ -140,6 +154,56 @@ class Novel(BasicElement):
         self.countryCode: str = None
         # Country code acc. to ISO 3166-2.
 
+        self._idGenerators: dict[int, IdGenerator] = {}
+        # key = id() of an element dictionary, value = IdGenerator instance.
+
+        self._languageCache: dict[str, tuple] = {}
+        # key = scene ID, value = (scene content, list of language codes found in it).
+
+    def create_id(self, elements: dict) -> str:
+        """Return an unused ID for a new element.
+        
+        Positional arguments:
+            elements -- dictionary containing all existing IDs, e.g. self.scenes.
+            
+        Keep one ID generator per element dictionary, 
+        so that creating an ID takes amortized constant time.
+        """
+        idGenerator = self._idGenerators.get(id(elements), None)
+        if idGenerator is None or idGenerator.elements is not elements:
+            idGenerator = IdGenerator(elements)
+            self._idGenerators[id(elements)] = idGenerator
+        return idGenerator.create_id()
+
+    def count_scenes(self, processes: int=1):
+        """Count the words and letters of all scenes.
+        
+        Optional arguments:
+            processes -- int: number of worker processes. If 1, count in the current process.
+            
+        Set the word count and the letter count of all scenes at once,
+        e.g. in order to distribute the work of large manuscripts among CPU cores.
+        """
+        scIds = list(self.scenes)
+        texts = [self.scenes[scId].sceneContent for scId in scIds]
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                chunksize = max(1, len(texts) // (processes * 4))
+                counts = list(executor.map(count_words_and_letters, texts, chunksize=chunksize))
+        else:
+            counts = [count_words_and_letters(text) for text in texts]
+        for scId, (wordCount, letterCount) in zip(scIds, counts):
+            self.scenes[scId].wordCount = wordCount
+            self.scenes[scId].letterCount = letterCount
+
+    def get_scene_table(self) -> SceneTable:
+        """Return a columnar snapshot of the scene statistics.
+        
+        Use it for bulk statistics, e.g. word counts per chapter, 
+        instead of looping over the scene instances.
+        """
+        return SceneTable(self)
+
     def get_languages(self):
         """Determine the languages used in the document.
         
@@ -148,28 +212,39 @@ class Novel(BasicElement):
         - language markup: 'Standard text [lang=en-AU]Australian text[/lang=en-AU].'
         - language code: 'en-AU'
         """
+        self._languageCache = {}
+        self.update_languages()
 
-        def languages(text: str) -> Iterator[str]:
-            """Return the language codes appearing in text.
-            
-            Example:
-            - language markup: 'Standard text [lang=en-AU]Australian text[/lang=en-AU].'
-            - language code: 'en-AU'
-            """
-            if text:
-                m = LANGUAGE_TAG.search(text)
-                while m:
-                    text = text[m.span()[1]:]
-                    yield m.group(1)
-                    m = LANGUAGE_TAG.search(text)
-
+    def update_languages(self):
+        """Determine the languages used in the document, rescanning only changed scenes.
+        
+        Populate the self.languages list like get_languages(), but
+        reuse the language codes found in scenes whose content has not been
+        replaced since the last call.
+        """
+        languageCache = {}
+        languageSet = set()
         self.languages = []
         for scId in self.scenes:
             text = self.scenes[scId].sceneContent
-            if text:
-                for language in languages(text):
-                    if not language in self.languages:
-                        self.languages.append(language)
+            cached = self._languageCache.get(scId)
+            if cached is not None and cached[0] is text:
+                sceneLanguages = cached[1]
+            else:
+                sceneLanguages = []
+                if text:
+                    sceneLanguageSet = set()
+                    for m in LANGUAGE_TAG.finditer(text):
+                        language = m.group(1)
+                        if not language in sceneLanguageSet:
+                            sceneLanguageSet.add(language)
+                            sceneLanguages.append(language)
+            languageCache[scId] = (text, sceneLanguages)
+            for language in sceneLanguages:
+                if not language in languageSet:
+                    languageSet.add(language)
+                    self.languages.append(language)
+        self._languageCache = languageCache
 
     def check_locale(self):
         """Check the document's locale (language code and country code).
@@ -24,13 +24,31 @@ NON_LETTERS: Pattern = re.compile('\[.+?\]|\/\*.+?\*\/|\n|\r')
 # from letter counting
 
 
+def count_words(text: str) -> int:
+    """Return the number of words in text, counted like in LibreOffice."""
+    if not text:
+        return 0
+
+    text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+    text = NO_WORD_LIMITS.sub('', text)
+    return len(text.split())
+
+
+def count_letters(text: str) -> int:
+    """Return the number of letters in text, counted like in LibreOffice."""
+    if not text:
+        return 0
+
+    return len(NON_LETTERS.sub('', text))
+
+
 class Scene(BasicElement):
     """yWriter scene representation.
     
     Public instance variables:
         sceneContent: str -- scene content (property with getter and setter).
-        wordCount: int -- word count (derived; updated by the sceneContent setter).
-        letterCount: int -- letter count (derived; updated by the sceneContent setter).
+        wordCount: int -- word count (derived from sceneContent on demand; property with getter and setter).
+        letterCount: int -- letter count (derived from sceneContent on demand; property with getter and setter).
         scType: int -- Scene type (Normal/Notes/Todo/Unused).
         doNotExport: bool -- True if the scene is not to be exported to RTF.
         status: int -- scene status (Outline/Draft/1st Edit/2nd Edit/Done).
@@ -69,6 +87,14 @@ class Scene(BasicElement):
     NULL_DATE: str = '0001-01-01'
     NULL_TIME: str = '00:00:00'
 
+    __slots__ = (
+        '_sceneContent', '_wordCount', '_letterCount', 'scType', 'doNotExport', 'status', 'notes',
+        'tags', 'field1', 'field2', 'field3', 'field4', 'appendToPrev', 'isReactionScene',
+        'isSubPlot', 'goal', 'conflict', 'outcome', 'characters', 'locations', 'items', 'date',
+        'time', 'minute', 'hour', 'day', 'lastsMinutes', 'lastsHours', 'lastsDays', 'image',
+        'scnArcs', 'scnStyle',
+    )
+
     def __init__(self):
         """Initialize instance variables.
         
@@ -80,13 +106,15 @@ class Scene(BasicElement):
         # xml: <SceneContent>
         # Scene text with yW7 raw markup.
 
-        self.wordCount: int = 0
+        self._wordCount: int = 0
         # xml: <WordCount>
-        # To be updated by the sceneContent setter
+        # None means: To be counted by the wordCount getter.
+        # Reset by the sceneContent setter.
 
-        self.letterCount: int = 0
+        self._letterCount: int = 0
         # xml: <LetterCount>
-        # To be updated by the sceneContent setter
+        # None means: To be counted by the letterCount getter.
+        # Reset by the sceneContent setter.
 
         self.scType: int = None
         # Scene type (Normal/Notes/Todo/Unused).
@@ -215,11 +243,29 @@ class Scene(BasicElement):
 
     @sceneContent.setter
     def sceneContent(self, text: str):
-        """Set sceneContent updating word count and letter count."""
+        """Set sceneContent, invalidating word count and letter count."""
         self._sceneContent = text
-        text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
-        text = NO_WORD_LIMITS.sub('', text)
-        wordList = text.split()
-        self.wordCount = len(wordList)
-        text = NON_LETTERS.sub('', self._sceneContent)
-        self.letterCount = len(text)
+        self._wordCount = None
+        self._letterCount = None
+
+    @property
+    def wordCount(self) -> int:
+        if self._wordCount is None:
+            self._wordCount = count_words(self._sceneContent)
+        return self._wordCount
+
+    @wordCount.setter
+    def wordCount(self, count: int):
+        """Set the word count, e.g. if counted elsewhere."""
+        self._wordCount = count
+
+    @property
+    def letterCount(self) -> int:
+        if self._letterCount is None:
+            self._letterCount = count_letters(self._sceneContent)
+        return self._letterCount
+
+    @letterCount.setter
+    def letterCount(self, count: int):
+        """Set the letter count, e.g. if counted elsewhere."""
+        self._letterCount = count
@@ -0,0 +1,91 @@
+"""Provide a class for a columnar scene table.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from array import array
+from itertools import compress
+from itertools import repeat
+from operator import eq
+from operator import ge
+from pywriter.model.scene import Scene
+
+
+class SceneTable:
+    """Columnar snapshot of the novel's scene statistics.
+
+    Public methods:
+        get_chapter_word_counts() -- Return the word count per chapter.
+        get_status_histogram() -- Return the number of scenes per status.
+        get_progress(minStatus) -- Return the share of words in scenes having at least the given status.
+
+    Public instance variables:
+        scIds: list of str -- scene IDs, one per row.
+        chIds: list of str -- chapter IDs in the novel's order.
+        chapterStarts: array of int -- first row of each chapter, followed by the end of the last chapter.
+        wordCounts: array of int -- word count per row.
+        letterCounts: array of int -- letter count per row.
+        statuses: array of int -- scene status per row (0 if not set).
+        scTypes: array of int -- scene type per row (0 if not set).
+
+    The rows are ordered by chapter, so the scenes of a chapter are a contiguous slice.
+    Scenes that belong to no chapter follow the last chapter's rows.
+    The table does not follow changes of the novel; create a new one instead.
+    """
+
+    def __init__(self, novel):
+        """Materialize the scene columns.
+
+        Positional arguments:
+            novel -- Novel instance.
+        """
+        self.scIds: list[str] = []
+        self.chIds: list[str] = list(novel.srtChapters)
+        self.chapterStarts = array('l')
+        knownIds = set()
+        for chId in self.chIds:
+            self.chapterStarts.append(len(self.scIds))
+            for scId in novel.chapters[chId].srtScenes:
+                if scId in novel.scenes and not scId in knownIds:
+                    knownIds.add(scId)
+                    self.scIds.append(scId)
+        self.chapterStarts.append(len(self.scIds))
+        self.scIds.extend(scId for scId in novel.scenes if not scId in knownIds)
+        scenes = [novel.scenes[scId] for scId in self.scIds]
+        self.wordCounts = array('q', [scene.wordCount or 0 for scene in scenes])
+        self.letterCounts = array('q', [scene.letterCount or 0 for scene in scenes])
+        self.statuses = array('b', [scene.status or 0 for scene in scenes])
+        self.scTypes = array('b', [scene.scType or 0 for scene in scenes])
+
+    def get_chapter_word_counts(self) -> dict:
+        """Return the word count per chapter.
+
+        Return a dictionary (key: chapter ID, value: sum of the scene word counts).
+        """
+        return {chId: sum(self.wordCounts[self.chapterStarts[i]:self.chapterStarts[i + 1]])
+                for i, chId in enumerate(self.chIds)}
+
+    def get_status_histogram(self) -> list:
+        """Return the number of scenes per status.
+
+        Return a list with one count per entry of Scene.STATUS; index 0 counts the scenes without status.
+        """
+        return [self.statuses.count(status) for status in range(len(Scene.STATUS))]
+
+    def get_progress(self, minStatus: int) -> float:
+        """Return the share of words in scenes having at least the given status.
+
+        Positional arguments:
+            minStatus -- int: index of a Scene.STATUS entry, e.g. 3 for "1st Edit".
+
+        Only normal scenes are taken into account.
+        Return a value between 0.0 and 1.0.
+        """
+        normalWordCounts = array('q', compress(self.wordCounts, map(eq, self.scTypes, repeat(0))))
+        normalStatuses = array('b', compress(self.statuses, map(eq, self.scTypes, repeat(0))))
+        total = sum(normalWordCounts)
+        if not total:
+            return 0.0
+
+        return sum(compress(normalWordCounts, map(ge, normalStatuses, repeat(minStatus)))) / total
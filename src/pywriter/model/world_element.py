@@ -16,6 +16,8 @@ class WorldElement(BasicElement):
         aka: str -- alternate name.
     """
 
+    __slots__ = ('image', 'tags', 'aka')
+
     def __init__(self):
         """Initialize instance variables.
         
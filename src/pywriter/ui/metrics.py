@@ -0,0 +1,73 @@
+"""Provide a class for collecting conversion timings and counters.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Metrics:
+    """Collect per-phase timings and counters of a conversion.
+
+    Public methods:
+        phase(name) -- Context manager timing a phase.
+        count(name, n) -- Add n to a counter.
+        as_dict() -- Return the timings and counters.
+
+    Public instance variables:
+        timers -- dict: key = phase name, value = float: seconds spent in this phase.
+        counters -- dict: key = counter name, value = int.
+
+    Phases can be nested. The time of a nested phase is not added to the enclosing one,
+    so the timers sum up to the total time spent in phases.
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self._stack = []
+        # Names of the phases currently running, the innermost last.
+        self._startTime = None
+        # Start time of the innermost phase's current time slice.
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager timing a phase.
+
+        Positional arguments:
+            name -- str: phase name, e.g. 'parse'.
+        """
+        now = perf_counter()
+        if self._stack:
+            self._add_time(self._stack[-1], now)
+        self._stack.append(name)
+        self._startTime = now
+        try:
+            yield
+        finally:
+            now = perf_counter()
+            self._add_time(self._stack.pop(), now)
+            self._startTime = now
+
+    def count(self, name, n=1):
+        """Add n to a counter.
+
+        Positional arguments:
+            name -- str: counter name, e.g. 'items'.
+
+        Optional arguments:
+            n -- int: increment.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        """Return the timings and counters."""
+        return dict(
+            timers={name: round(seconds, 6) for name, seconds in self.timers.items()},
+            counters=dict(self.counters),
+            )
+
+    def _add_time(self, name, now):
+        self.timers[name] = self.timers.get(name, 0.0) + now - self._startTime
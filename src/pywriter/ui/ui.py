@@ -15,6 +15,7 @@ class Ui:
     
     Public methods:
         ask_yes_no(text) -- return True or False.
+        report_metrics(metrics) -- pass conversion timings and counters to the metrics sink, if any.
         set_info_how(message) -- show how the converter is doing.
         set_info_what(message) -- show what the converter is going to do.
         show_warning(message) -- Stub for displaying a warning message.
@@ -23,6 +24,7 @@ class Ui:
     Public instance variables:
         infoWhatText -- buffer for general messages.
         infoHowText -- buffer for error/success messages.
+        metricsSink -- callable taking a dictionary of timings and counters, or None.
     """
 
     def __init__(self, title):
@@ -33,6 +35,7 @@ class Ui:
         """
         self.infoWhatText = ''
         self.infoHowText = ''
+        self.metricsSink = None
 
     def ask_yes_no(self, text):
         """Return True or False.
@@ -45,6 +48,15 @@ class Ui:
         """
         return True
 
+    def report_metrics(self, metrics):
+        """Pass conversion timings and counters to the metrics sink, if any.
+        
+        Positional arguments:
+            metrics -- dict: {'timers': {phase: seconds}, 'counters': {name: int}}.
+        """
+        if self.metricsSink is not None:
+            self.metricsSink(metrics)
+
     def set_info_how(self, message):
         """Show how the converter is doing.
         
@@ -0,0 +1,97 @@
+"""Provide a class for writing indented XML files element by element.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import xml.etree.ElementTree as ET
+
+
+class XmlStreamWriter:
+    """Streaming XML writer with pretty printing.
+    
+    Public methods:
+        write_declaration() -- Write the XML declaration.
+        start(tag, attrib) -- Open an element that is to contain subelements.
+        end() -- Close the element opened last.
+        write_element(element) -- Write a complete ElementTree element.
+
+    The output is the same as the output of ElementTree.write() 
+    for a tree formatted with xml_indent.indent(). 
+    However, only the elements currently written are held in memory.
+    """
+
+    def __init__(self, file):
+        """Initialize instance variables.
+        
+        Positional arguments:
+            file -- text file object opened for writing.
+        """
+        self._file = file
+        self._openTags = []
+        # Stack of the tags of the open elements.
+        self._isEmpty = False
+        # True if the element opened last has no subelements yet.
+
+    def write_declaration(self, encoding='utf-8'):
+        """Write the XML declaration like ElementTree does."""
+        self._file.write(f"<?xml version='1.0' encoding='{encoding}'?>\n")
+
+    def start(self, tag, attrib={}):
+        """Open an element that is to contain subelements.
+        
+        Positional arguments:
+            tag -- str: the element's tag.
+        
+        Optional arguments:
+            attrib -- dict: the element's attributes.
+        """
+        self._begin_subelement()
+        startTag = ET.tostring(ET.Element(tag, attrib), encoding='unicode')
+        # Let ElementTree escape the attributes; strip the closing ' />' of the empty element.
+        self._file.write(startTag[:-3])
+        self._openTags.append(tag)
+        self._isEmpty = True
+
+    def end(self):
+        """Close the element opened last."""
+        tag = self._openTags.pop()
+        if self._isEmpty:
+            self._file.write(' />')
+        else:
+            self._file.write(f'\n{len(self._openTags) * "  "}</{tag}>')
+        self._isEmpty = False
+        if not self._openTags:
+            self._file.write('\n')
+
+    def write_element(self, element):
+        """Write a complete ElementTree element as a subelement of the element opened last.
+        
+        Positional arguments:
+            element -- ElementTree element instance.
+            
+        The element's text and tail, and the tails of its subelements are overwritten.
+        """
+        self._begin_subelement()
+        level = len(self._openTags)
+        self._indent(element, level)
+        element.tail = None
+        self._file.write(ET.tostring(element, encoding='unicode'))
+
+    def _begin_subelement(self):
+        """Complete the parent's start tag, if necessary, and begin a new line."""
+        if self._isEmpty:
+            self._file.write('>')
+            self._isEmpty = False
+        if self._openTags:
+            self._file.write(f'\n{len(self._openTags) * "  "}')
+
+    def _indent(self, element, level):
+        """Set whitespace text and tails of a small element tree for pretty printing."""
+        if len(element):
+            if not element.text or not element.text.strip():
+                element.text = f'\n{(level + 1) * "  "}'
+            for subelement in element:
+                self._indent(subelement, level + 1)
+                subelement.tail = f'\n{(level + 1) * "  "}'
+            subelement.tail = f'\n{level * "  "}'
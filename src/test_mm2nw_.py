@@ -5,10 +5,36 @@ For further information see https://github.com/peter88213/mm2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import io
 import unittest
 from shutil import copyfile, rmtree, copytree
 import re
+import zipfile
+import xml.etree.ElementTree as ET
+import tracemalloc
+import json
+import threading
+import urllib.request
+import urllib.error
+from unittest import mock
 import mm2nw_
+import bench_mm2nw
+from pywriter.pywriter_globals import Error
+from pywriter.model.id_generator import IdGenerator
+from pywriter.model.id_generator import create_id
+from pywriter.model.novel import Novel
+from pywriter.model.novel import LANGUAGE_TAG
+from pywriter.model.scene import Scene
+from pywriter.model.scene import count_words
+from pywriter.model.chapter import Chapter
+from yw2nwlib.handles import Handles
+from yw2nwlib.nwx_file import NwxFile
+from pywriter.yw.xml_stream_writer import XmlStreamWriter
+from mm2yw7lib.mm_file import MmFile
+from mm2nwlib.mm_nw_converter import MmNwConverter
+from mm2nwlib.mm_nw_server import MmNwServer
+from mm2nwlib.mm_nw_watcher import MmNwWatcher
+from pywriter.ui.ui import Ui
 
 # Test environment
 
@@ -21,6 +47,8 @@ TEST_EXEC_PATH = TEST_PATH
 NW_NORMAL = 'normal.nw'
 PROJECT = 'Sample Project'
 NORMAL_MM = 'normal.mm'
+NW_RICHTEXT = 'richtext.nw'
+RICHTEXT_MM = 'richtext.mm'
 
 
 def read_file(inputFile):
@@ -46,6 +74,10 @@ def remove_all_testfiles():
         rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw')
     except:
         pass
+    try:
+        os.remove(f'{TEST_EXEC_PATH}{PROJECT}.nw.zip')
+    except:
+        pass
 
 
 class NormalOperation(unittest.TestCase):
@@ -73,6 +105,860 @@ class NormalOperation(unittest.TestCase):
         remove_all_testfiles()
 
 
+class StreamingOperation(NormalOperation):
+    """Test case: Normal operation, parsing the mindmap incrementally."""
+
+    def setUp(self):
+        super().setUp()
+        mm2nw_.OPTIONS['stream_mindmap'] = True
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['stream_mindmap'] = False
+        super().tearDown()
+
+
+class RichTextOperation(NormalOperation):
+    """Test case: Converting notes with HTML formatting."""
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{RICHTEXT_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        os.chdir(TEST_EXEC_PATH)
+        mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_RICHTEXT}/nwProject.nwx'))
+        contentFiles = os.listdir(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
+        for contentFile in contentFiles:
+            self.assertEqual(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFile}'), read_file(
+                                        f'{TEST_DATA_PATH}{NW_RICHTEXT}/content/{contentFile}'))
+
+    def test_convert_html(self):
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        sourceFile = MmFile(f'{TEST_DATA_PATH}{RICHTEXT_MM}', **kwargs)
+        xmlRichcontent = ET.fromstring(
+            '<richcontent TYPE="NOTE"><html><head><title>x</title></head><body>'
+            '<p>Some  <b>bold</b>\n and <i>italic</i> text.</p>'
+            '<ul><li>one</li><li><s>two</s></li></ul>'
+            '<pre>\nline 1\n  line 2\n</pre>'
+            '</body></html></richcontent>')
+        self.assertEqual(sourceFile._convert_html(xmlRichcontent),
+                         'Some [b]bold[/b] and [i]italic[/i] text.\n- one\n- [s]two[/s]\nline 1\n  line 2')
+        self.assertEqual(sourceFile._convert_html(xmlRichcontent, markup=False),
+                         'Some bold and italic text. - one - two line 1 line 2')
+
+
+class StreamingLargeMap(unittest.TestCase):
+    """Test case: Streaming a mindmap larger than the parser's buffer."""
+
+    def setUp(self):
+        try:
+            os.mkdir(TEST_EXEC_PATH)
+        except:
+            pass
+        remove_all_testfiles()
+
+    def convert(self, sourcePath, streamMindmap):
+        """Return the project files converted in memory."""
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        kwargs['stream_mindmap'] = streamMindmap
+        kwargs['in_memory'] = True
+        sourceFile = MmFile(sourcePath, **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        targetFile.write()
+        return {filePath: adjust_timestamp(text) for filePath, text in targetFile.memoryFiles.items()}
+
+    def test_stream_equals_dom(self):
+        sourcePath = f'{TEST_EXEC_PATH}{PROJECT}.mm'
+        bench_mm2nw.generate_mindmap(sourcePath, parts=3, chapters=5, scenes=5, characters=10, noteSize=80)
+        self.assertEqual(self.convert(sourcePath, True), self.convert(sourcePath, False))
+
+    def test_read_error(self):
+        sourcePath = f'{TEST_EXEC_PATH}{PROJECT}.mm'
+        with open(sourcePath, 'w', encoding='utf-8') as f:
+            f.write('<map version="1.0.1">\n<node TEXT="Broken">\n')
+        for streamMindmap in (True, False):
+            with self.assertRaises(Error):
+                self.convert(sourcePath, streamMindmap)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class NodeIdHandleOperation(unittest.TestCase):
+    """Test case: Keeping the handles of the chapters and scenes when a chapter is inserted."""
+
+    def setUp(self):
+        try:
+            os.mkdir(TEST_EXEC_PATH)
+        except:
+            pass
+        remove_all_testfiles()
+
+    def convert(self, nodeIdHandles):
+        """Return the handles of the converted project items by item type and name."""
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        kwargs['node_id_handles'] = nodeIdHandles
+        kwargs['in_memory'] = True
+        sourceFile = MmFile(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        targetFile.write()
+        xmlRoot = ET.fromstring(targetFile.memoryFiles[f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx'])
+        return {(xmlItem.get('type'), xmlItem.find('name').text): xmlItem.get('handle')
+                for xmlItem in xmlRoot.iter('item')}
+
+    def insert_chapter(self):
+        """Insert a chapter with a scene before the first chapter of the mindmap."""
+        text = read_file(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        firstChapter = '<node CREATED="1685824056049" ID="ID_1059238039"'
+        self.assertIn(firstChapter, text)
+        text = text.replace(firstChapter, (
+            '<node ID="ID_1000000001" TEXT="Neues Kapitel">\n'
+            '<node ID="ID_1000000002" TEXT="Neue Szene"/>\n'
+            f'</node>\n{firstChapter}'))
+        with open(f'{TEST_EXEC_PATH}{PROJECT}.mm', 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_keep_handles(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        handles = self.convert(True)
+        self.insert_chapter()
+        newHandles = self.convert(True)
+        self.assertEqual(len(newHandles), len(handles) + 3)
+        for key, handle in handles.items():
+            self.assertEqual(newHandles[key], handle, key)
+
+    def test_order_dependent_handles(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        handles = self.convert(False)
+        self.insert_chapter()
+        newHandles = self.convert(False)
+        self.assertNotEqual(newHandles[('FILE', 'Erste Szene')], handles[('FILE', 'Erste Szene')])
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class IncrementalOperation(NormalOperation):
+    """Test case: Incremental operation, converting the same mindmap twice."""
+
+    def setUp(self):
+        super().setUp()
+        mm2nw_.OPTIONS['incremental'] = True
+
+    def test_mm_to_nw(self):
+        super().test_mm_to_nw()
+        contentPath = f'{TEST_EXEC_PATH}{PROJECT}.nw/content'
+        for contentFile in os.listdir(contentPath):
+            os.utime(f'{contentPath}/{contentFile}', ns=(0, 0))
+        super().test_mm_to_nw()
+        self.assertFalse(os.path.isdir(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak'))
+        for contentFile in os.listdir(contentPath):
+            self.assertEqual(os.stat(f'{contentPath}/{contentFile}').st_mtime_ns, 0)
+
+    def test_write_failure(self):
+        super().test_mm_to_nw()
+        prjDir = f'{TEST_EXEC_PATH}{PROJECT}.nw'
+        manifests = {}
+        for fileName in (NwxFile.STATE_FILE, NwxFile.HASH_FILE):
+            if os.path.isfile(f'{prjDir}/{fileName}'):
+                manifests[fileName] = read_file(f'{prjDir}/{fileName}')
+        self.assertTrue(manifests)
+
+        # Add a chapter, and make the .nwd files unwritable by putting directories in their place.
+        text = read_file(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        firstChapter = '<node CREATED="1685824056049" ID="ID_1059238039"'
+        text = text.replace(firstChapter, f'<node ID="ID_1000000001" TEXT="Neues Kapitel"/>\n{firstChapter}')
+        with open(f'{TEST_EXEC_PATH}{PROJECT}.mm', 'w', encoding='utf-8') as f:
+            f.write(text)
+        for contentFile in os.listdir(f'{prjDir}/content'):
+            os.remove(f'{prjDir}/content/{contentFile}')
+            os.mkdir(f'{prjDir}/content/{contentFile}')
+        mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        self.assertEqual(adjust_timestamp(read_file(f'{prjDir}/nwProject.nwx')),
+                         read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+        for fileName, text in manifests.items():
+            self.assertEqual(read_file(f'{prjDir}/{fileName}'), text)
+        self.assertFalse([entry for entry in os.listdir(prjDir) if entry.endswith('.tmp')])
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['incremental'] = False
+        try:
+            rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak')
+        except:
+            pass
+        super().tearDown()
+
+
+class HandleOperation(NormalOperation):
+    """Test case: Creating novelWriter handles, and keeping the handles of a previous run."""
+
+    def test_create_member(self):
+        for fastHandles in (False, True):
+            nwHandles = Handles(fastHandles)
+            handles = [nwHandles.create_member(f'{i}Scene') for i in range(1000)]
+            nwHandles.create_member('1Scene')
+            # A repeated text gets a unique handle.
+            for handle in nwHandles.members:
+                self.assertRegex(handle, '^[0-9a-f]{13}$')
+            self.assertEqual(len(set(nwHandles.members)), 1001)
+            self.assertEqual(nwHandles.members[:1000], handles)
+
+    def test_add_member(self):
+        nwHandles = Handles(True)
+        self.assertTrue(nwHandles.add_member('a2193e531fe3e'))
+        self.assertFalse(nwHandles.add_member('a2193e531fe3e'))
+        self.assertFalse(nwHandles.add_member('a2193e531fe3'))
+        self.assertFalse(nwHandles.add_member('a2193e531fe3ef'))
+        self.assertFalse(nwHandles.add_member('g2193e531fe3e'))
+        self.assertTrue(nwHandles.has_member('a2193e531fe3e'))
+
+    def read_handles(self):
+        """Return the project's handles by item type and name."""
+        xmlRoot = ET.parse(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx').getroot()
+        return {(xmlItem.get('type'), xmlItem.find('name').text): xmlItem.get('handle')
+                for xmlItem in xmlRoot.iter('item')}
+
+    def test_mm_to_nw(self):
+        # Create a project with the legacy handles, then update it with fast handles.
+        mm2nw_.OPTIONS['incremental'] = True
+        super().test_mm_to_nw()
+        handles = self.read_handles()
+        with open(f'{TEST_EXEC_PATH}{PROJECT}.nw/{NwxFile.STATE_FILE}', 'r', encoding='utf-8') as f:
+            nodeHandles = set(json.load(f)['nodes'].values())
+        mm2nw_.OPTIONS['fast_handles'] = True
+        mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        newHandles = self.read_handles()
+        self.assertEqual(set(newHandles), set(handles))
+        for key, handle in newHandles.items():
+            self.assertRegex(handle, '^[0-9a-f]{13}$')
+            if handles[key] in nodeHandles:
+                # The item represents a mindmap node.
+                self.assertEqual(handle, handles[key], key)
+        self.assertEqual(newHandles[('FILE', 'Erste Szene')], 'e42ee69472c39')
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['incremental'] = False
+        mm2nw_.OPTIONS['fast_handles'] = False
+        try:
+            rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak')
+        except:
+            pass
+        super().tearDown()
+
+
+class SkipUnchangedOperation(IncrementalOperation):
+    """Test case: Converting the same mindmap twice, skipping the unchanged files."""
+
+    def setUp(self):
+        NormalOperation.setUp(self)
+        mm2nw_.OPTIONS['skip_unchanged'] = True
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['skip_unchanged'] = False
+        super().tearDown()
+
+
+class WriteFailure(NormalOperation):
+    """Test case: Keeping the previous project file when a .nwd file cannot be written."""
+
+    def test_mm_to_nw(self):
+        super().test_mm_to_nw()
+        prjPath = f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx'
+        contentFiles = sorted(os.listdir(f'{TEST_EXEC_PATH}{PROJECT}.nw/content'))
+        contentFile = contentFiles[len(contentFiles) // 2]
+        os.remove(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFile}')
+        os.mkdir(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFile}')
+        # A directory in place of a .nwd file cannot be opened for writing.
+        for writeThreads in (1, 4):
+            kwargs = dict(mm2nw_.SETTINGS)
+            kwargs.update(mm2nw_.OPTIONS)
+            kwargs['write_threads'] = writeThreads
+            sourceFile = MmFile(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+            sourceFile.novel = Novel()
+            sourceFile.read()
+            targetFile = NwxFile(prjPath, **kwargs)
+            targetFile.novel = sourceFile.novel
+            with self.assertRaises(Error):
+                targetFile.write()
+            self.assertEqual(adjust_timestamp(read_file(prjPath)), read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+            self.assertFalse(os.path.exists(f'{prjPath}.tmp'))
+
+
+class ArchiveOperation(NormalOperation):
+    """Test case: Archive operation, writing and reading a zipped project."""
+
+    def setUp(self):
+        super().setUp()
+        mm2nw_.OPTIONS['archive'] = True
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        os.chdir(TEST_EXEC_PATH)
+        mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        self.assertFalse(os.path.isdir(f'{TEST_EXEC_PATH}{PROJECT}.nw'))
+        with zipfile.ZipFile(f'{TEST_EXEC_PATH}{PROJECT}.nw.zip') as archive:
+            self.assertEqual(adjust_timestamp(archive.read('nwProject.nwx').decode('utf-8')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+            contentFiles = os.listdir(f'{TEST_DATA_PATH}{NW_NORMAL}/content')
+            self.assertEqual(len(archive.namelist()), len(contentFiles) + 1)
+            for contentFile in contentFiles:
+                self.assertEqual(archive.read(f'content/{contentFile}').decode('utf-8'), read_file(
+                                            f'{TEST_DATA_PATH}{NW_NORMAL}/content/{contentFile}'))
+
+    def test_read_archive(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        os.chdir(TEST_EXEC_PATH)
+        mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        archivedProject = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        archivedProject.novel = Novel()
+        archivedProject.read()
+        kwargs['archive'] = False
+        project = NwxFile(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx', **kwargs)
+        project.novel = Novel()
+        project.read()
+        self.assertEqual(archivedProject.novel.srtChapters, project.novel.srtChapters)
+        for scId in project.novel.scenes:
+            self.assertEqual(archivedProject.novel.scenes[scId].title, project.novel.scenes[scId].title)
+            self.assertEqual(archivedProject.novel.scenes[scId].desc, project.novel.scenes[scId].desc)
+
+    def test_overwrite_archive(self):
+        self.test_mm_to_nw()
+        archivePath = f'{TEST_EXEC_PATH}{PROJECT}.nw.zip'
+        self.assertFalse(os.path.isfile(f'{archivePath}.bak'))
+        with open(archivePath, 'rb') as f:
+            archiveData = f.read()
+        kwargs = {'suffix': mm2nw_.SUFFIX}
+        kwargs.update(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        converter = MmNwConverter()
+        converter.ui = Ui('')
+
+        # Refuse to overwrite the archive.
+        with mock.patch.object(converter.ui, 'ask_yes_no', return_value=False) as askYesNo:
+            converter.run(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+        askYesNo.assert_called_once()
+        self.assertTrue(converter.ui.infoHowText.startswith('FAIL'))
+        self.assertFalse(os.path.isfile(f'{archivePath}.bak'))
+
+        # Overwrite the archive, keeping a backup.
+        converter.run(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+        with open(f'{archivePath}.bak', 'rb') as f:
+            self.assertEqual(f.read(), archiveData)
+        with zipfile.ZipFile(archivePath) as archive:
+            self.assertEqual(adjust_timestamp(archive.read('nwProject.nwx').decode('utf-8')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['archive'] = False
+        try:
+            os.remove(f'{TEST_EXEC_PATH}{PROJECT}.nw.zip.bak')
+        except:
+            pass
+        super().tearDown()
+
+
+class StagedOperation(NormalOperation):
+    """Test case: Staged operation, replacing an existing project in one step."""
+
+    def setUp(self):
+        super().setUp()
+        mm2nw_.OPTIONS['staged_write'] = True
+        mm2nw_.OPTIONS['fsync'] = True
+
+    def test_mm_to_nw(self):
+        super().test_mm_to_nw()
+        super().test_mm_to_nw()
+        self.assertTrue(os.path.isfile(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak/nwProject.nwx'))
+        prjDir = f'{TEST_EXEC_PATH}{PROJECT}.nw'
+        stagingPrefix = f'.{os.path.basename(prjDir)}.'
+        self.assertFalse([entry for entry in os.listdir(os.path.dirname(prjDir)) if entry.startswith(stagingPrefix)])
+
+    def test_fsync_once(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        with mock.patch('os.fsync', wraps=os.fsync) as fsync:
+            mm2nw_.main(f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        fileCount = 1 + len(os.listdir(f'{TEST_EXEC_PATH}{PROJECT}.nw/content'))
+        # The project file and the .nwd files.
+        self.assertEqual(fsync.call_count, fileCount + 3)
+        # Each file, the content and project directories, and the directory holding the project.
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['staged_write'] = False
+        mm2nw_.OPTIONS['fsync'] = False
+        try:
+            rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak')
+        except:
+            pass
+        super().tearDown()
+
+
+class DryRunOperation(NormalOperation):
+    """Test case: Dry run, converting in memory."""
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        os.chdir(TEST_EXEC_PATH)
+        kwargs = {'suffix': mm2nw_.SUFFIX}
+        kwargs.update(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        kwargs['dry_run'] = True
+        converter = MmNwConverter()
+        converter.ui = Ui('')
+        converter.run(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+        self.assertFalse(os.path.exists(f'{TEST_EXEC_PATH}{PROJECT}.nw'))
+        memoryFiles = {os.path.relpath(filePath, f'{TEST_EXEC_PATH}{PROJECT}.nw'): text
+                       for filePath, text in converter.memoryFiles.items()}
+        self.assertEqual(adjust_timestamp(memoryFiles.pop('nwProject.nwx')),
+                         read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+        contentFiles = os.listdir(f'{TEST_DATA_PATH}{NW_NORMAL}/content')
+        self.assertEqual(len(memoryFiles), len(contentFiles))
+        for contentFile in contentFiles:
+            self.assertEqual(memoryFiles[f'content/{contentFile}'],
+                             read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/content/{contentFile}'))
+
+
+class BatchOperation(NormalOperation):
+    """Test case: Batch operation, converting two mindmaps in two worker processes."""
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT} 2.mm')
+        os.chdir(TEST_EXEC_PATH)
+        summary = mm2nw_.batch([f'{TEST_EXEC_PATH}{PROJECT}.mm', f'{TEST_EXEC_PATH}{PROJECT} 2.mm',
+                                f'{TEST_EXEC_PATH}{PROJECT}.mm'], processes=2)
+        self.assertEqual(summary['total'], 2)
+        self.assertEqual(summary['processes'], 2)
+        self.assertEqual(summary['succeeded'], 2)
+        for project in (PROJECT, f'{PROJECT} 2'):
+            self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{project}.nw/nwProject.nwx')),
+                                                read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+            contentFiles = os.listdir(f'{TEST_EXEC_PATH}{project}.nw/content')
+            for contentFile in contentFiles:
+                self.assertEqual(read_file(f'{TEST_EXEC_PATH}{project}.nw/content/{contentFile}'), read_file(
+                                            f'{TEST_DATA_PATH}{NW_NORMAL}/content/{contentFile}'))
+
+    def tearDown(self):
+        try:
+            os.remove(f'{TEST_EXEC_PATH}{PROJECT} 2.mm')
+        except:
+            pass
+        try:
+            rmtree(f'{TEST_EXEC_PATH}{PROJECT} 2.nw')
+        except:
+            pass
+        super().tearDown()
+
+
+class ServerOperation(NormalOperation):
+    """Test case: Converting via the local conversion service."""
+
+    def setUp(self):
+        super().setUp()
+        kwargs = {'suffix': mm2nw_.SUFFIX}
+        kwargs.update(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        self.server = MmNwServer(port=0, processes=1, **kwargs)
+        self.url = f'http://{self.server.address[0]}:{self.server.address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def request(self, path, data=None, contentType='application/json'):
+        """Return the response status and the decoded JSON body."""
+        request = urllib.request.Request(f'{self.url}{path}', data=data)
+        if data is not None:
+            request.add_header('Content-Type', contentType)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.loads(response.read())
+
+        except urllib.error.HTTPError as ex:
+            return ex.code, json.loads(ex.read())
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        body = json.dumps({'source': f'{TEST_EXEC_PATH}{PROJECT}.mm'}).encode('utf-8')
+        status, summary = self.request('/convert', body)
+        self.assertEqual(status, 200)
+        self.assertEqual(summary['succeeded'], 1)
+        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+        status, serviceStatus = self.request('/status')
+        self.assertEqual(status, 200)
+        self.assertEqual(serviceStatus['jobs'], 1)
+        self.assertEqual(serviceStatus['failed'], 0)
+
+    def test_concurrent_requests(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        body = json.dumps({'sources': [f'{TEST_EXEC_PATH}{PROJECT}.mm'] * 2}).encode('utf-8')
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(self.request('/convert', body))) for __ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for status, summary in responses:
+            self.assertEqual(status, 200)
+            self.assertEqual(summary['succeeded'], 2)
+        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+        self.assertEqual(self.server._sourceLocks, {})
+        # The locks of finished jobs are removed.
+
+    def test_bad_requests(self):
+        self.assertEqual(self.request('/convert', b'{"target": 1}')[0], 400)
+        self.assertEqual(self.request('/convert', b'{"sources": "abc"}')[0], 400)
+        self.assertEqual(self.request('/convert', b'{"sources": []}')[0], 400)
+        self.assertEqual(self.request('/convert', b'{"sources": ["x.mm", 1]}')[0], 400)
+        self.assertEqual(self.request('/convert', b'["sources"]')[0], 400)
+        self.assertEqual(self.request('/status')[1]['jobs'], 0)
+        self.assertEqual(self.request('/convert', b'no json')[0], 400)
+        self.assertEqual(self.request('/convert', b'{"source": "x.mm"}', 'text/plain')[0], 415)
+        self.assertEqual(self.request('/unknown', b'{}')[0], 404)
+        self.assertEqual(self.request('/unknown')[0], 404)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        for extension in ('.bak', '.bk000'):
+            try:
+                rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw{extension}')
+            except:
+                pass
+        super().tearDown()
+
+
+class WatcherOperation(NormalOperation):
+    """Test case: Re-converting a watched mindmap when it changes."""
+
+    def test_mm_to_nw(self):
+        sourcePath = f'{TEST_EXEC_PATH}{PROJECT}.mm'
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', sourcePath)
+        kwargs = {'suffix': mm2nw_.SUFFIX}
+        kwargs.update(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        converter = MmNwConverter()
+        converter.ui = Ui('')
+        watcher = MmNwWatcher(converter, [sourcePath], debounce=0)
+        watcher.quiet = True
+        with mock.patch.object(converter, 'run', wraps=converter.run) as run:
+            self.assertEqual(watcher.poll(**kwargs), [sourcePath])
+            self.assertEqual(run.call_count, 1)
+            self.assertTrue(os.path.isfile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx'))
+            self.assertEqual(watcher.poll(**kwargs), [])
+            self.assertEqual(run.call_count, 1)
+
+            # Touch the mindmap.
+            stat = os.stat(sourcePath)
+            os.utime(sourcePath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+            self.assertEqual(watcher.poll(**kwargs), [sourcePath])
+            self.assertEqual(run.call_count, 2)
+            self.assertEqual(watcher.poll(**kwargs), [])
+            self.assertEqual(run.call_count, 2)
+        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
+                                            read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+
+
+class MetricsOperation(NormalOperation):
+    """Test case: Passing the conversion timings and counters to the metrics sink."""
+
+    def test_mm_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{NORMAL_MM}', f'{TEST_EXEC_PATH}{PROJECT}.mm')
+        kwargs = {'suffix': mm2nw_.SUFFIX}
+        kwargs.update(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        converter = MmNwConverter()
+        converter.ui = Ui('')
+        sink = []
+        converter.ui.metricsSink = sink.append
+        converter.run(f'{TEST_EXEC_PATH}{PROJECT}.mm', **kwargs)
+        self.assertEqual(len(sink), 1)
+        metrics = sink[0]
+        self.assertEqual(set(metrics['timers']), {'parse', 'model', 'handles', 'rendering', 'xml', 'io'})
+        for seconds in metrics['timers'].values():
+            self.assertGreaterEqual(seconds, 0.0)
+        prjDir = f'{TEST_EXEC_PATH}{PROJECT}.nw'
+        contentFiles = os.listdir(f'{prjDir}/content')
+        fileSizes = [os.path.getsize(f'{prjDir}/nwProject.nwx')]
+        fileSizes.extend(os.path.getsize(f'{prjDir}/content/{contentFile}') for contentFile in contentFiles)
+        self.assertEqual(metrics['counters'], dict(
+            items=39,
+            scenes=10,
+            words=0,
+            documents=len(contentFiles),
+            bytes=sum(fileSizes),
+            ))
+
+    def test_word_count(self):
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        kwargs['in_memory'] = True
+        sourceFile = MmFile(f'{TEST_DATA_PATH}{NORMAL_MM}', **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        scIds = list(sourceFile.novel.scenes)
+        sourceFile.novel.scenes[scIds[0]].sceneContent = 'One two three.'
+        sourceFile.novel.scenes[scIds[1]].sceneContent = 'Four five.\nSix.'
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        targetFile.write()
+        self.assertEqual(targetFile.metrics.counters['scenes'], len(scIds))
+        self.assertEqual(targetFile.metrics.counters['words'], 6)
+
+
+class PipelineOperation(unittest.TestCase):
+    """Test case: Rendering the project items without writing them."""
+
+    def test_render_documents(self):
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        sourceFile = MmFile(f'{TEST_DATA_PATH}{NORMAL_MM}', **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        items = targetFile.render_documents(targetFile.assign_handles(targetFile.plan_items()))
+        documents = {}
+        for nwItem, document in items:
+            if document is not None:
+                filePath, text = document
+                documents[os.path.basename(filePath)] = text
+        self.assertEqual(sorted(documents), sorted(os.listdir(f'{TEST_DATA_PATH}{NW_NORMAL}/content')))
+        for contentFile, text in documents.items():
+            self.assertEqual(text, read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/content/{contentFile}'))
+        self.assertFalse(os.path.exists(f'{TEST_EXEC_PATH}{PROJECT}.nw'))
+
+    def test_write_project(self):
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        sourceFile = MmFile(f'{TEST_DATA_PATH}{NORMAL_MM}', **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        documents = []
+        # The sink receives (file path, text) pairs in project order.
+        with io.StringIO() as f:
+            targetFile.write_project(
+                XmlStreamWriter(f),
+                targetFile.render_documents(targetFile.assign_handles(targetFile.plan_items())),
+                lambda filePath, text: documents.append((os.path.basename(filePath), text)),
+                )
+            xmlText = f.getvalue()
+        self.assertEqual(adjust_timestamp(xmlText), read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/nwProject.nwx'))
+        self.assertEqual(sorted(contentFile for contentFile, __ in documents),
+                         sorted(os.listdir(f'{TEST_DATA_PATH}{NW_NORMAL}/content')))
+        for contentFile, text in documents:
+            self.assertEqual(text, read_file(f'{TEST_DATA_PATH}{NW_NORMAL}/content/{contentFile}'))
+        self.assertFalse(os.path.exists(f'{TEST_EXEC_PATH}{PROJECT}.nw'))
+
+
+class ThreadedOperation(NormalOperation):
+    """Test case: Writing the .nwd files with a thread pool while the project file is written."""
+
+    def setUp(self):
+        super().setUp()
+        mm2nw_.OPTIONS['write_threads'] = 4
+
+    def test_streaming_documents(self):
+        kwargs = dict(mm2nw_.SETTINGS)
+        kwargs.update(mm2nw_.OPTIONS)
+        sourceFile = MmFile(f'{TEST_DATA_PATH}{NORMAL_MM}', **kwargs)
+        sourceFile.novel = Novel()
+        sourceFile.read()
+        os.makedirs(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
+        targetFile = NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **kwargs)
+        targetFile.novel = sourceFile.novel
+        itemCounts = []
+        # Number of project items written when a .nwd file is submitted.
+        write_document = targetFile.write_document
+
+        def record_item_count(filePath, text):
+            itemCounts.append(targetFile.metrics.counters['items'])
+            write_document(filePath, text)
+
+        targetFile.write_document = record_item_count
+        targetFile.write()
+        self.assertEqual(len(itemCounts), len(os.listdir(f'{TEST_DATA_PATH}{NW_NORMAL}/content')))
+        self.assertLess(itemCounts[0], targetFile.metrics.counters['items'])
+
+    def tearDown(self):
+        mm2nw_.OPTIONS['write_threads'] = 1
+        super().tearDown()
+
+
+class IdGeneration(unittest.TestCase):
+    """Test case: Creating unused element IDs."""
+
+    def test_empty(self):
+        elements = {}
+        self.assertEqual(create_id(elements), '1')
+        self.assertEqual(IdGenerator(elements).create_id(), '1')
+
+    def test_gaps(self):
+        elements = dict.fromkeys(['1', '2', '4', '7'])
+        idGenerator = IdGenerator(elements)
+        for expectedId in ('3', '5', '6', '8', '9'):
+            self.assertEqual(create_id(elements), expectedId)
+            self.assertEqual(idGenerator.create_id(), expectedId)
+            elements[expectedId] = None
+
+    def test_repeated_calls(self):
+        elements = {}
+        idGenerator = IdGenerator(elements)
+        self.assertEqual(idGenerator.create_id(), '1')
+        self.assertEqual(idGenerator.create_id(), '1')
+        # The ID is not used until an element is added.
+        for i in range(1, 101):
+            newId = idGenerator.create_id()
+            self.assertEqual(newId, str(i))
+            self.assertEqual(newId, create_id(elements))
+            elements[newId] = None
+
+    def test_novel(self):
+        novel = Novel()
+        for __ in range(3):
+            novel.scenes[novel.create_id(novel.scenes)] = Scene()
+        novel.chapters[novel.create_id(novel.chapters)] = Chapter()
+        self.assertEqual(list(novel.scenes), ['1', '2', '3'])
+        self.assertEqual(list(novel.chapters), ['1'])
+        novel.scenes = {'2': Scene()}
+        # A new dictionary gets a new generator.
+        self.assertEqual(novel.create_id(novel.scenes), '1')
+
+
+class ModelMemory(unittest.TestCase):
+    """Test case: Memory footprint of the slotted model classes."""
+
+    def test_scene_size(self):
+
+        class DictScene(Scene):
+            """Scene subclass with a per-instance __dict__."""
+            pass
+
+        def allocate(sceneClass):
+            tracemalloc.start()
+            scenes = [sceneClass() for __ in range(1000)]
+            size, __ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return size
+
+        self.assertFalse(hasattr(Scene(), '__dict__'))
+        self.assertLess(allocate(Scene), allocate(DictScene))
+
+
+class SceneCounting(unittest.TestCase):
+    """Test case: Counting the words and letters of the scenes on demand."""
+
+    def test_lazy_count(self):
+        scene = Scene()
+        with mock.patch('pywriter.model.scene.count_words', wraps=count_words) as countWords:
+            scene.sceneContent = 'One two three.'
+            self.assertEqual(countWords.call_count, 0)
+            self.assertEqual(scene.wordCount, 3)
+            self.assertEqual(scene.wordCount, 3)
+            self.assertEqual(countWords.call_count, 1)
+            self.assertEqual(scene.letterCount, 14)
+            scene.sceneContent = '[i]Four[/i] five-six\nseven'
+            self.assertEqual(scene.wordCount, 3)
+            self.assertEqual(scene.letterCount, 18)
+            self.assertEqual(countWords.call_count, 2)
+        scene.wordCount = 10
+        self.assertEqual(scene.wordCount, 10)
+        scene.sceneContent = None
+        self.assertEqual(scene.wordCount, 0)
+        self.assertEqual(scene.letterCount, 0)
+
+    def test_count_scenes(self):
+        texts = ['One two three.', '[i]Four[/i] five-six\nseven', 'Eight -- nine /* comment */', None]
+        for processes in (1, 2):
+            novel = Novel()
+            for text in texts:
+                scene = Scene()
+                scene.sceneContent = text
+                novel.scenes[novel.create_id(novel.scenes)] = scene
+            novel.count_scenes(processes)
+            self.assertEqual([scene._wordCount for scene in novel.scenes.values()], [3, 3, 2, 0])
+            self.assertEqual([scene._letterCount for scene in novel.scenes.values()], [14, 18, 14, 0])
+            novel.scenes['1'].sceneContent = 'Ten.'
+            self.assertEqual(novel.scenes['1'].wordCount, 1)
+            self.assertEqual(novel.scenes['1'].letterCount, 4)
+
+
+class LanguageDetection(unittest.TestCase):
+    """Test case: Collecting the language codes of the scene contents."""
+
+    def test_update_languages(self):
+        novel = Novel()
+        for text in (
+                'Standard text [lang=en-AU]Australian text[/lang=en-AU] [lang=de-CH]Schweizer Text[/lang=de-CH].',
+                '[lang=en-AU]More Australian text[/lang=en-AU] and [lang=fr-FR]texte français[/lang=fr-FR].',
+                None,
+                ):
+            scene = Scene()
+            scene.sceneContent = text
+            novel.scenes[novel.create_id(novel.scenes)] = scene
+        with mock.patch('pywriter.model.novel.LANGUAGE_TAG', wraps=LANGUAGE_TAG) as languageTag:
+            novel.get_languages()
+            self.assertEqual(novel.languages, ['en-AU', 'de-CH', 'fr-FR'])
+            self.assertEqual(languageTag.finditer.call_count, 2)
+            novel.update_languages()
+            self.assertEqual(novel.languages, ['en-AU', 'de-CH', 'fr-FR'])
+            self.assertEqual(languageTag.finditer.call_count, 2)
+
+            # Changing a scene's content invalidates its cached language codes.
+            novel.scenes['2'].sceneContent = 'No language markup.'
+            novel.update_languages()
+            self.assertEqual(novel.languages, ['en-AU', 'de-CH'])
+            self.assertEqual(languageTag.finditer.call_count, 3)
+            del novel.scenes['1']
+            novel.update_languages()
+            self.assertEqual(novel.languages, [])
+            self.assertEqual(languageTag.finditer.call_count, 3)
+
+            # get_languages() scans all scenes.
+            novel.get_languages()
+            self.assertEqual(novel.languages, [])
+            self.assertEqual(languageTag.finditer.call_count, 4)
+
+
+class SceneTableOperation(unittest.TestCase):
+    """Test case: Bulk statistics with the columnar scene table."""
+
+    def test_statistics(self):
+        novel = Novel()
+        for chId in ('1', '2'):
+            novel.chapters[chId] = Chapter()
+            novel.srtChapters.append(chId)
+        for scId, chId, text, status, scType in (
+                ('1', '1', 'One two three', 1, 0),
+                ('2', '1', 'Four five', 3, 0),
+                ('3', '2', 'Six', 5, 0),
+                ('4', '2', 'Seven eight nine ten', 5, 1),
+                ('5', None, 'Eleven', 2, 0),
+                ):
+            novel.scenes[scId] = Scene()
+            novel.scenes[scId].sceneContent = text
+            novel.scenes[scId].status = status
+            novel.scenes[scId].scType = scType
+            if chId is not None:
+                novel.chapters[chId].srtScenes.append(scId)
+        sceneTable = novel.get_scene_table()
+        self.assertEqual(sceneTable.scIds, ['1', '2', '3', '4', '5'])
+        self.assertEqual(sceneTable.get_chapter_word_counts(), {'1': 5, '2': 5})
+        self.assertEqual(sceneTable.get_status_histogram(), [0, 1, 1, 1, 0, 2])
+        self.assertEqual(sceneTable.get_progress(3), 3 / 7)
+
+
 def main():
     unittest.main()
 
@@ -5,27 +5,48 @@ For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 from hashlib import pbkdf2_hmac
+from hashlib import blake2b
 
 
 class Handles:
-    """Hold a list of novelWriter compatible handles.
+    """Hold a set of novelWriter compatible handles.
     
-    The only purpose of this list is to use unique handles.
+    Public methods:
+        has_member(handle) -- Return True if handle is in the set of handles.
+        add_member(handle) -- Add handle to the set, if unique and compliant.
+        create_member(text) -- Create a handle derived from text and add it to the set of handles.
+
+    Public instance variables:
+        members -- list of str: the handles in insertion order (read-only property).
+
+    The only purpose of this set is to use unique handles.
     Therefore, it is not intended to delete members.
     """
     HANDLE_CHARS = list('abcdef0123456789')
     SIZE = 13
+    _DIGITS_TO_HANDLE_CHARS = str.maketrans('0123456789abcdef', ''.join(HANDLE_CHARS))
+
+    def __init__(self, fastHandles=False):
+        """Initialize the set of handles.
+        
+        Optional arguments:
+            fastHandles -- bool: if True, derive new handles from a single blake2b digest.
+        """
+        self._handles = {}
+        # Dictionary keys are hashed and keep the insertion order; the values are not used.
+        self._handleChars = set(self.HANDLE_CHARS)
+        self._fastHandles = fastHandles
 
-    def __init__(self):
-        """Initialize the list of handles."""
-        self._handles = []
+    @property
+    def members(self):
+        return list(self._handles)
 
     def has_member(self, handle):
-        """Return True if handle is in the list of handles."""
+        """Return True if handle is in the set of handles."""
         return handle in self._handles
 
     def add_member(self, handle):
-        """Add handle to the list, if unique and compliant.
+        """Add handle to the set, if unique and compliant.
         
         Return True on success.
         Return False if handle is not accepted for any reason.
@@ -36,15 +57,14 @@ class Handles:
         if len(handle) != self.SIZE:
             return False
 
-        for c in handle:
-            if not c in self.HANDLE_CHARS:
-                return False
+        if not self._handleChars.issuperset(handle):
+            return False
 
-        self._handles.append(handle)
+        self._handles[handle] = None
         return True
 
     def create_member(self, text):
-        """Create a handle derived from text and add it to the list of handles.
+        """Create a handle derived from text and add it to the set of handles.
 
         Positional arguments:
             text -- string from which the handle is derived.
@@ -64,12 +84,22 @@ class Handles:
             text = text.encode('utf-8')
             key = pbkdf2_hmac('sha1', text, bytes(salt), 1)
             keyInt = int.from_bytes(key, byteorder='big')
-            handle = ''
-            while len(handle) < self.SIZE and keyInt > 0:
-                handle += self.HANDLE_CHARS[keyInt % len(self.HANDLE_CHARS)]
-                keyInt //= len(self.HANDLE_CHARS)
-            return handle
+            # The handle consists of the key's hex digits, least significant first,
+            # mapped to HANDLE_CHARS.
+            return f'{keyInt:x}'[::-1][:self.SIZE].translate(self._DIGITS_TO_HANDLE_CHARS)
+
+        def create_fast_handle(text, salt):
+            """Return a handle for novelWriter, derived from a single blake2b digest.
+            
+            Positional arguments:
+                text -- string from which the handle is derived.
+                salt -- additional string to make the handle unique. 
+            """
+            digest = blake2b(text.encode('utf-8'), digest_size=7, salt=salt.to_bytes(16, byteorder='big'))
+            return digest.hexdigest()[:self.SIZE]
 
+        if self._fastHandles:
+            create_handle = create_fast_handle
         i = 0
         handle = create_handle(text, i)
         while not self.add_member(handle):
@@ -137,7 +137,7 @@ class NwdCharacterFile(NwdFile):
 
         # Set yWriter description.
         if character.desc:
-            self._lines.append(f'\n{character.desc}')
+            self._lines.append(f'\n{self._convert_markup(character.desc)}')
 
         # Set yWriter bio.
         if character.bio:
@@ -5,6 +5,7 @@ For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import re
 from pywriter.pywriter_globals import *
 
 
@@ -13,10 +14,37 @@ class NwdFile:
     
     Public methods:
         read() -- read a content file.
+        render() -- return the text of a content file.
         write() -- write a content file.
+
+    Public instance variables:
+        filePath -- str: path to the content file (read-only property).
     """
     EXTENSION = '.nwd'
 
+    # Conversion from yw7 markup to Markdown:
+    _MD_SPACING = (
+        ('[i] ', ' [i]'),
+        ('[b] ', ' [b]'),
+        ('[s] ', ' [s]'),
+        (' [/i]', '[/i] '),
+        (' [/b]', '[/b] '),
+        (' [/s]', '[/s] '),
+        ('  ', ' '),
+    )
+    # Move spaces out of the formatting tags and remove double spaces.
+    # This can precede the tag conversion, because the tags are not replaced by spaces.
+    _YW_TAGS = re.compile(r'\[(?:/?[ibs]|/*[h|c|r|u]\d*)\]')
+    # Formatting tags to be converted, and highlighting, alignment, and underline tags to be removed.
+    _MD_TAGS = {
+        '[i]': '_',
+        '[/i]': '_',
+        '[b]': '**',
+        '[/b]': '**',
+        '[s]': '~~',
+        '[/s]': '~~',
+    }
+
     def __init__(self, prj, nwItem):
         """Define instance variables.
         
@@ -29,34 +57,46 @@ class NwdFile:
         self._filePath = os.path.dirname(self._prj.filePath) + self._prj.CONTENT_DIR + nwItem.nwHandle + self.EXTENSION
         self._lines = []
 
+    @property
+    def filePath(self):
+        return self._filePath
+
+    def _convert_markup(self, text):
+        """Return text with yw7 formatting tags converted to Markdown, and all other tags removed."""
+        for yw, md in self._MD_SPACING:
+            text = text.replace(yw, md)
+        # Convert italics, bold, and strikethrough, and remove all other tags in one pass.
+        return self._YW_TAGS.sub(self._replace_yw_tag, text)
+
+    def _replace_yw_tag(self, match):
+        """Return the Markdown replacement for a yw7 tag matched by _YW_TAGS."""
+        return self._MD_TAGS.get(match.group(), '')
+
     def read(self):
         """Read a content file.
         
         Return a message beginning with the ERROR constant in case of error.
         """
         try:
-            with open(self._filePath, 'r', encoding='utf-8') as f:
-                self._lines = f.read().split('\n')
-                return 'Item data read in.'
+            self._lines = self._prj.read_document(self._filePath).split('\n')
+            return 'Item data read in.'
 
         except:
             raise Error(f'Can not read "{norm_path(self._filePath)}".')
 
-    def write(self):
-        """Write a content file. 
-        
-        Return a message beginning with the ERROR constant in case of error.
-        """
+    def render(self):
+        """Return the text of a content file, including the meta data header."""
         lines = [f'%%~name: {self._nwItem.nwName}',
                  f'%%~path: {self._nwItem.nwParent}/{self._nwItem.nwHandle}',
                  f'%%~kind: {self._nwItem.nwClass}/{self._nwItem.nwLayout}',
                  ]
         lines.extend(self._lines)
-        text = '\n'.join(lines)
-        try:
-            with open(self._filePath, 'w', encoding='utf-8') as f:
-                f.write(text)
-                return 'nwd file saved.'
+        return '\n'.join(lines)
 
-        except:
-            raise Error(f'Can not write "{norm_path(self._filePath)}".')
+    def write(self):
+        """Write a content file. 
+        
+        Return a message beginning with the ERROR constant in case of error.
+        """
+        self._prj.write_document(self._filePath, self.render())
+        return 'nwd file saved.'
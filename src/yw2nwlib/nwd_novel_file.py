@@ -18,6 +18,7 @@ class NwdNovelFile(NwdFile):
         read() -- read a content file.
         add_scene(scId) -- add a scene to the file content.
         add_chapter(chId) -- add a chapter to the file content.
+        convert_lines_to_yw(lines) -- Generate lines, converted from Markdown to yw7 markup.
     """
     _POV_TAG = '@pov: '
     _CHARACTER_TAG = '@char: '
@@ -25,6 +26,15 @@ class NwdNovelFile(NwdFile):
     _ITEM_TAG = '@object: '
     _SYNOPSIS_KEYWORD = 'synopsis:'
 
+    # Conversion from Markdown to yw7 markup:
+    _MD_DELIMITERS = re.compile(r'\*\*|~~|_')
+    # Emphasis delimiters for bold, strikethrough, and italics.
+    _YW_FORMATS = {
+        '**': ('[b]', '[/b]'),
+        '~~': ('[s]', '[/s]'),
+        '_': ('[i]', '[/i]'),
+    }
+
     def __init__(self, prj, nwItem):
         """Define instance variables.
         
@@ -81,29 +91,10 @@ class NwdNovelFile(NwdFile):
             else:
                 return text
 
-        # Convert italics, bold, and strikethrough.
-        MD_REPLACEMENTS = [
-            ('[i] ', ' [i]'),
-            ('[b] ', ' [b]'),
-            ('[s] ', ' [s]'),
-            (' [/i]', '[/i] '),
-            (' [/b]', '[/b] '),
-            (' [/s]', '[/s] '),
-            ('[i]', '_'),
-            ('[/i]', '_'),
-            ('[b]', '**'),
-            ('[/b]', '**'),
-            ('[s]', '~~'),
-            ('[/s]', '~~'),
-            ('  ', ' '),
-        ]
-        if self.doubleLinebreaks:
-            MD_REPLACEMENTS.insert(0, ['\n', '\n\n'])
         try:
-            for yw, md in MD_REPLACEMENTS:
-                text = text.replace(yw, md)
-            text = re.sub('\[\/*[h|c|r|u]\d*\]', '', text)
-            # Remove highlighting, alignment, and underline tags
+            if self.doubleLinebreaks:
+                text = text.replace('\n', '\n\n')
+            text = self._convert_markup(text)
         except AttributeError:
             text = ''
         return text
@@ -116,29 +107,91 @@ class NwdNovelFile(NwdFile):
         
         Overrides the superclass method.
         """
-
-        # Convert bold, italics, and strikethrough.
-        text = re.sub('\*\*(.+?)\*\*', '[b]\\1[/b]', text)
-        text = re.sub('\_([^ ].+?[^ ])\_', '[i]\\1[/i]', text)
-        text = re.sub('\~\~(.+?)\~\~', '[s]\\1[/s]', text)
-
-        # Text alignment in yWriter is more complicated than it seems
-        # at first glance, so don't support it for now.
-        # text = re.sub('\>\>(.+?)\<\<\n', '[c]\\1\n[/c]', text)
-        # text = re.sub('\>\>(.+?)\<\<', '[c]\\1', text)
-        # text = re.sub('\>\>(.+?)\n', '[r]\\1\n[/r]', text)
-        # text = re.sub('\>\>(.+?)', '[r]\\1', text)
-        # text = text.replace('<<', '')
-
-        MD_REPLACEMENTS = []
-        if self.doubleLinebreaks:
-            MD_REPLACEMENTS.insert(0, ('\n\n', '\n'))
         try:
-            for md, yw in MD_REPLACEMENTS:
-                text = text.replace(md, yw)
+            lines = text.split('\n')
         except AttributeError:
-            text = ''
-        return text
+            return ''
+
+        return '\n'.join(self.convert_lines_to_yw(lines))
+
+    def convert_lines_to_yw(self, lines):
+        """Generate lines, converted from Markdown to yw7 markup.
+        
+        Positional arguments:
+            lines -- iterable of str: lines without line breaks.
+        
+        If the double_linebreaks option is set, 
+        each pair of consecutive line breaks is reduced to one line break.
+        Text alignment in yWriter is more complicated than it seems
+        at first glance, so don't support it for now.
+        """
+        if not self.doubleLinebreaks:
+            for line in lines:
+                yield self._convert_line_to_yw(line)
+            return
+
+        currentLine = None
+        lineBreaks = 0
+        # Consecutive line breaks not yet written.
+        for line in lines:
+            if currentLine is None:
+                currentLine = ''
+            else:
+                lineBreaks += 1
+            if line:
+                for __ in range((lineBreaks + 1) // 2):
+                    yield currentLine
+                    currentLine = ''
+                lineBreaks = 0
+                currentLine += self._convert_line_to_yw(line)
+        if currentLine is None:
+            return
+
+        for __ in range((lineBreaks + 1) // 2):
+            yield currentLine
+            currentLine = ''
+        yield currentLine
+
+    def _convert_line_to_yw(self, line):
+        """Return a single line, converted from Markdown to yw7 markup.
+        
+        Positional arguments:
+            line -- str: line without line break.
+        
+        Convert bold, italics, and strikethrough in one pass, allowing nested emphasis.
+        A closing delimiter matches the nearest opening delimiter of the same kind,
+        provided that the enclosed text is not empty. Italics delimiters must not
+        be separated from the enclosed text by a space. Unmatched delimiters are kept.
+        """
+        pieces = []
+        openDelimiters = []
+        # Stack of (delimiter, index in pieces, end position in line) tuples.
+        start = 0
+        for match in self._MD_DELIMITERS.finditer(line):
+            delimiter = match.group()
+            pieces.append(line[start:match.start()])
+            start = match.end()
+            if delimiter == '_':
+                canOpen = start < len(line) and line[start] != ' '
+                canClose = match.start() > 0 and line[match.start() - 1] != ' '
+            else:
+                canOpen = canClose = True
+            if canClose:
+                i = len(openDelimiters) - 1
+                while i >= 0 and openDelimiters[i][0] != delimiter:
+                    i -= 1
+                if i >= 0 and openDelimiters[i][2] < match.start():
+                    # Discard the unmatched delimiters in between.
+                    pieces[openDelimiters[i][1]], closingTag = self._YW_FORMATS[delimiter]
+                    pieces.append(closingTag)
+                    del openDelimiters[i:]
+                    continue
+
+            if canOpen:
+                openDelimiters.append((delimiter, len(pieces), start))
+            pieces.append(delimiter)
+        pieces.append(line[start:])
+        return ''.join(pieces)
 
     def read(self):
         """Read a content file.
@@ -149,8 +202,7 @@ class NwdNovelFile(NwdFile):
 
         def set_scene_content(scId, contentLines, characters, locations, items, synopsis, tags):
             if scId is not None:
-                text = '\n'.join(contentLines)
-                self._prj.novel.scenes[scId].sceneContent = self._convert_to_yw(text)
+                self._prj.novel.scenes[scId].sceneContent = '\n'.join(self.convert_lines_to_yw(contentLines))
                 self._prj.novel.scenes[scId].desc = '\n'.join(synopsis)
                 self._prj.novel.scenes[scId].characters = characters
                 self._prj.novel.scenes[scId].locations = locations
@@ -326,7 +378,7 @@ class NwdNovelFile(NwdFile):
 
         # Set synopsis.
         if scene.desc:
-            synopsis = scene.desc.replace('\n', '\t')
+            synopsis = self._convert_markup(scene.desc).replace('\n', '\t')
             self._lines.append(f'\n% {self._SYNOPSIS_KEYWORD} {synopsis}')
 
         # Separate the text body by a blank line.
@@ -351,5 +403,5 @@ class NwdNovelFile(NwdFile):
 
         # Set yWriter chapter description.
         if chapter.desc:
-            synopsis = chapter.desc.replace('\n', '\t')
+            synopsis = self._convert_markup(chapter.desc).replace('\n', '\t')
             self._lines.append(f'\n% {self._SYNOPSIS_KEYWORD} {synopsis}\n')
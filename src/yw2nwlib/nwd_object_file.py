@@ -105,5 +105,4 @@ class NwdObjectFile(NwdFile):
 
         # Set yWriter description.
         if item.desc:
-            self._lines.append(f'\n{item.desc}')
-        return super().write()
+            self._lines.append(f'\n{self._convert_markup(item.desc)}')
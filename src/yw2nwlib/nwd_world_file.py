@@ -105,5 +105,4 @@ class NwdWorldFile(NwdFile):
 
         # Set yWriter description.
         if location.desc:
-            self._lines.append(f'\n{location.desc}')
-        return super().write()
+            self._lines.append(f'\n{self._convert_markup(location.desc)}')
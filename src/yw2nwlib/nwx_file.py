@@ -5,11 +5,19 @@ For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import io
+import json
+import zipfile
+from contextlib import contextmanager
+from collections import deque
 import xml.etree.ElementTree as ET
+from hashlib import sha1
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pywriter.pywriter_globals import *
 from pywriter.file.file import File
-from pywriter.yw.xml_indent import indent
+from pywriter.yw.xml_stream_writer import XmlStreamWriter
+from mm2yw7lib.mm_file import MmFile
 from yw2nwlib.handles import Handles
 from yw2nwlib.nw_item_v1_5 import NwItemV15
 from yw2nwlib.nwd_character_file import NwdCharacterFile
@@ -20,6 +28,43 @@ from yw2nwlib.nwd_object_file import NwdObjectFile
 WRITE_NEW_FORMAT = True
 
 
+def sync_file(filePath):
+    """Flush a written file to the storage device.
+    
+    Positional arguments:
+        filePath -- str: path to the file.
+    
+    Raise the "Error" exception in case of error.
+    """
+    try:
+        fd = os.open(filePath, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        raise Error(f'Can not write "{norm_path(filePath)}".')
+
+
+def sync_dir(dirPath):
+    """Flush a directory's entries to the storage device, where the platform supports it.
+    
+    Positional arguments:
+        dirPath -- str: path to the directory.
+    """
+    try:
+        fd = os.open(dirPath, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 class NwxFile(File):
     """novelWriter project representation.
     
@@ -28,6 +73,12 @@ class NwxFile(File):
         read() -- parse the novelWriter xml and md files and get the instance variables.
         merge(source) -- copy the yWriter project parts that can be mapped to the novelWriter project.
         write() -- write instance variables to the novelWriter files.
+        read_document(filePath) -- return the text of a .nwd file.
+        write_document(filePath, text) -- write a .nwd file.
+        plan_items() -- generate the project items in project order, without handles.
+        assign_handles(plans) -- generate the project items with handles.
+        render_documents(items) -- generate the project items with the rendered text of their .nwd files.
+        write_project(xmlWriter, items, write_document) -- write the XML project file, passing on each .nwd file.
     
     Public class variables:
         EXTENSION -- str: file extension of the novelWriter xml file. 
@@ -35,9 +86,15 @@ class NwxFile(File):
         SUFFIX -- str: file name suffix (not applicable).
         CONTENT_DIR -- str: relative path to the "content" directory.
         CONTENT_EXTENSION -- str: extension of the novelWriter markdown files.
+        STATE_FILE -- str: name of the incremental conversion state file in the project directory.
+        HASH_FILE -- str: name of the .nwd content hash manifest in the project directory.
+        ARCHIVE_EXTENSION -- str: extension appended to the project directory path in archive mode.
+        NODE_ID_KWVAR -- str: key of the elements' keyword variable holding the source node ID.
 
     Public instance variables:
-        nwHandles -- Handles instance (list of handles with methods).
+        nwHandles -- Handles instance (set of handles with methods).
+        archivePath -- str: path to the zip archive holding the project in archive mode, otherwise None.
+        memoryFiles -- dict: in-memory mode: (key: file path, value: text of the project file or .nwd file), otherwise None.
         kwargs -- keyword arguments, holding settings and options.
         lcCount -- int: number of locations. 
         crCount -- int: number of characters.
@@ -54,6 +111,11 @@ class NwxFile(File):
     SUFFIX = ''
     CONTENT_DIR = '/content/'
     CONTENT_EXTENSION = '.nwd'
+    STATE_FILE = 'mm2nwState.json'
+    HASH_FILE = 'mm2nwHashes.json'
+    ARCHIVE_EXTENSION = '.zip'
+    NODE_ID_KWVAR = MmFile.NODE_ID_KWVAR
+    # The key used by the mindmap reader.
     _NWX_TAG = 'novelWriterXML'
     _NWX_ATTR_V1_5 = {
         'appVersion': '2.0.2',
@@ -61,6 +123,21 @@ class NwxFile(File):
         'fileVersion': '1.5',
         'timeStamp': datetime.today().replace(microsecond=0).isoformat(sep=' '),
     }
+    _ROOT_FOLDERS = {
+        'characterFolder': ('Characters', 'CHARACTER'),
+        'worldFolder': ('Locations', 'WORLD'),
+        'objectFolder': ('Items', 'OBJECT'),
+        }
+    # Name and class of the world building root folders by item kind.
+    _NWD_TYPES = {
+        'partHeading': (NwdNovelFile, 'add_chapter'),
+        'chapterHeading': (NwdNovelFile, 'add_chapter'),
+        'scene': (NwdNovelFile, 'add_scene'),
+        'character': (NwdCharacterFile, 'add_character'),
+        'location': (NwdWorldFile, 'add_element'),
+        'item': (NwdObjectFile, 'add_element'),
+        }
+    # .nwd file class and the method adding the novel element by item kind.
     _NWD_CLASSES = {
         'CHARACTER':NwdCharacterFile,
         'WORLD':NwdWorldFile,
@@ -102,13 +179,24 @@ class NwxFile(File):
             first_edit_status -- tuple of str: novelWriter status to be converted to yWriter "1st Edit" scene status.
             second_edit_status -- tuple of str: novelWriter status to be converted to yWriter "2nd Edit" scene status.
             done_status -- tuple of str: novelWriter status to be converted to yWriter "Done" scene status.
+
+        Optional keyword arguments:
+            fast_handles -- bool: if True, derive new handles from a single blake2b digest.
+            write_threads -- int: number of threads writing the .nwd files (default: 1).
+            incremental -- bool: if True, keep the handles of known source nodes and write only changed .nwd files.
+            node_id_handles -- bool: if True, derive handles from the source node IDs, if any.
+            archive -- bool: if True, read and write the project as a single zip archive
+                             next to the project directory, e.g. "Project.nw.zip".
+            skip_unchanged -- bool: if True, write only the .nwd files whose content hash changed.
+            fsync -- bool: if True, flush the written files and directories to the storage device.
+            in_memory -- bool: if True, read and write the project files in memoryFiles instead of the file system.
     
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
         self._tree = None
         self.kwargs = kwargs
-        self.nwHandles = Handles()
+        self.nwHandles = Handles(kwargs.get('fast_handles', False))
         self.lcCount = 0
         self.crCount = 0
         self.itCount = 0
@@ -117,27 +205,112 @@ class NwxFile(File):
         self.chId = None
         self._sceneStatus = kwargs['scene_status']
         self.statusLookup = {}
+        self._writeThreads = kwargs.get('write_threads', 1)
+        self._fsync = kwargs.get('fsync', False)
+        self._writtenPaths = []
+        # Paths of the files written, to be flushed to the storage device at once.
+        if kwargs.get('in_memory', False):
+            self.memoryFiles = {}
+        else:
+            self.memoryFiles = None
+        if kwargs.get('archive', False) and self.memoryFiles is None:
+            self.archivePath = f'{os.path.dirname(filePath)}{self.ARCHIVE_EXTENSION}'
+        else:
+            self.archivePath = None
+        self._archive = None
+        # ZipFile instance, open while reading the archive.
+        onDisk = self.archivePath is None and self.memoryFiles is None
+        self._incremental = kwargs.get('incremental', False) and onDisk
+        self._skipUnchanged = (kwargs.get('skip_unchanged', False) or self._incremental) and onDisk
+        self._nodeIdHandles = kwargs.get('node_id_handles', False)
+        self._state = None
+        # Incremental conversion state of the previous run:
+        # 'nodes': source node ID -> handle.
+        self._newState = None
+        # Incremental conversion state of the current run.
+        self._hashes = None
+        # Content hash manifest of the previous run: handle -> content hash.
+        self._newHashes = None
+        # Content hash manifest of the current run.
 
     def read_xml_file(self):
         """Read the novelWriter XML project file to the project tree.
         
         Return a message beginning with the ERROR constant in case of error.
         """
+        if self.archivePath is not None and self._archive is None:
+            with self._open_archive():
+                self.read_xml_file()
+            return
+
         try:
-            self._tree = ET.parse(self.filePath)
+            if self._archive is not None:
+                with self._archive.open(os.path.basename(self.filePath)) as f:
+                    self._tree = ET.parse(f)
+            elif self.memoryFiles is not None:
+                self._tree = ET.ElementTree(ET.fromstring(self.memoryFiles[self.filePath]))
+            else:
+                self._tree = ET.parse(self.filePath)
         except:
             raise Error(f'Can not process "{norm_path(self.filePath)}".')
 
+    def read_document(self, filePath):
+        """Return the text of a .nwd file.
+        
+        Positional arguments:
+            filePath -- str: path to the .nwd file.
+        
+        In archive mode, read the file from the archive.
+        In in-memory mode, read the file from memoryFiles.
+        """
+        if self._archive is not None:
+            with self._archive.open(self._get_member_name(filePath)) as f:
+                return f.read().decode('utf-8')
+
+        if self.memoryFiles is not None:
+            return self.memoryFiles[filePath]
+
+        with open(filePath, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write_document(self, filePath, text):
+        """Write a .nwd file.
+        
+        Positional arguments:
+            filePath -- str: path to the .nwd file.
+            text -- str: content of the .nwd file.
+        
+        In in-memory mode, write the file to memoryFiles.
+        Raise the "Error" exception in case of error.
+        """
+        if self.memoryFiles is not None:
+            self.memoryFiles[filePath] = text
+            return
+
+        try:
+            with open(filePath, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except:
+            raise Error(f'Can not write "{norm_path(filePath)}".')
+
+        self._writtenPaths.append(filePath)
+
     def read(self):
         """Parse the novelWriter xml and md files and get the instance variables.
         
         Return a message beginning with the ERROR constant in case of error.
+        In archive mode, read the project from the zip archive.
         Overrides the superclass method.
         """
+        if self.archivePath is not None and self._archive is None:
+            with self._open_archive():
+                return self.read()
+
 
         #--- Read the XML file, if necessary.
         if self._tree is None:
-            self.read_xml_file()
+            with self.metrics.phase('parse'):
+                self.read_xml_file()
         root = self._tree.getroot()
 
         #--- Check file type and version; apply strategy pattern for the NwItem class.
@@ -225,73 +398,291 @@ class NwxFile(File):
         """Write instance variables to the novelWriter files.
         
         Return a message beginning with the ERROR constant in case of error.
+        In skip_unchanged or incremental mode, write only the .nwd files whose content
+        changed since the last run, and delete the .nwd files of removed items.
+        In incremental mode, keep the handles of known source nodes.
+        The project file and the manifests of these modes are replaced only when
+        all .nwd files are written, so a failure leaves the previous ones intact.
+        In archive mode, write the whole project into a zip archive instead.
+        In in-memory mode, write the whole project into memoryFiles.
         Override the superclass method.
         """
+        if self.memoryFiles is not None:
+            self._write_memory()
+            return f'"{norm_path(self.filePath)}" written to memory.'
 
-        def write_entry(parent, entry, red, green, blue, map):
-            """Write an XML entry with RGB values as attributes.
-            """
-            attrib = {}
-            attrib['key'] = map[entry]
-            attrib['count'] = '0'
-            attrib['blue'] = str(blue)
-            attrib['green'] = str(green)
-            attrib['red'] = str(red)
-            ET.SubElement(parent, 'entry', attrib).text = entry
+        if self._incremental:
+            with self.metrics.phase('io'):
+                self._read_state()
+            self._newState = {'nodes': {}}
+        if self._skipUnchanged:
+            with self.metrics.phase('io'):
+                self._read_hashes()
+            self._newHashes = {}
+        if self.archivePath is not None:
+            self._write_archive()
+            return f'"{norm_path(self.archivePath)}" written.'
 
-        root = ET.Element(self._NWX_TAG, self._NWX_ATTR_V1_5)
-        NwItem = NwItemV15
+        #--- Write the project file, and each .nwd file as soon as it is rendered.
+        # Write a temporary project file first, and replace the project file
+        # when all .nwd files are written, so that a failure leaves the previous one intact.
+        tempPath = f'{self.filePath}.tmp'
+        try:
+            with self.metrics.phase('xml'):
+                with open(tempPath, 'w', encoding='utf-8', errors='xmlcharrefreplace') as f:
+                    with self._document_writer() as write_document:
+                        self.write_project(XmlStreamWriter(f), self._generate_items(), write_document)
+                self.metrics.count('bytes', os.path.getsize(tempPath))
+            self._tree = None
+            with self.metrics.phase('io'):
+                if self._fsync:
+                    self._writtenPaths.append(tempPath)
+                    self._sync_written_files(f'{os.path.dirname(self.filePath)}{self.CONTENT_DIR}')
+                os.replace(tempPath, self.filePath)
+        except OSError:
+            raise Error(f'Can not write "{norm_path(self.filePath)}".')
 
-        #--- Write project metadata.
-        xmlPrj = ET.SubElement(root, 'project')
-        if self.novel.title:
-            title = self.novel.title
-        else:
-            title = 'New project'
-        ET.SubElement(xmlPrj, 'name').text = title
-        ET.SubElement(xmlPrj, 'title').text = title
-        if self.novel.authorName:
-            authors = self.novel.authorName.split(',')
-        else:
-            authors = ['']
-        for author in authors:
-            ET.SubElement(xmlPrj, 'author').text = author.strip()
+        finally:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
 
-        #--- Write settings.
-        settings = ET.SubElement(root, 'settings')
-        status = ET.SubElement(settings, 'status')
+        # The project file is complete, so the manifests can describe it.
+        with self.metrics.phase('io'):
+            if self._skipUnchanged:
+                self._remove_orphans()
+                self._write_hashes()
+            if self._incremental:
+                self._write_state()
+            if self._fsync:
+                if self._skipUnchanged:
+                    # Orphans may have been removed.
+                    self._sync_written_files(f'{os.path.dirname(self.filePath)}{self.CONTENT_DIR}', os.path.dirname(self.filePath))
+                else:
+                    self._sync_written_files(os.path.dirname(self.filePath))
+        return f'"{norm_path(self.filePath)}" written.'
+
+    def _sync_written_files(self, *dirPaths):
+        """Flush all files written so far to the storage device, then the given directories.
+        
+        Positional arguments:
+            dirPaths -- str: paths of the directories whose entries changed.
+        
+        Raise the "Error" exception in case of error.
+        """
+        writtenPaths = self._writtenPaths
+        self._writtenPaths = []
+        for filePath in writtenPaths:
+            sync_file(filePath)
+        for dirPath in dirPaths:
+            sync_dir(dirPath)
+
+    def _write_archive(self):
+        """Write the project file and the .nwd files into a zip archive in one pass.
+        
+        Write a temporary file first, and replace the archive when complete.
+        Raise the "Error" exception in case of error.
+        """
+        tempPath = f'{self.archivePath}.tmp'
         try:
-            write_entry(status, self._sceneStatus[0], 230, 230, 230, self.STATUS_IDS)
-            write_entry(status, self._sceneStatus[1], 0, 0, 0, self.STATUS_IDS)
-            write_entry(status, self._sceneStatus[2], 170, 40, 0, self.STATUS_IDS)
-            write_entry(status, self._sceneStatus[3], 240, 140, 0, self.STATUS_IDS)
-            write_entry(status, self._sceneStatus[4], 250, 190, 90, self.STATUS_IDS)
-            write_entry(status, self._sceneStatus[5], 58, 180, 58, self.STATUS_IDS)
-        except IndexError:
+            with zipfile.ZipFile(tempPath, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+
+                def write_document(filePath, text):
+                    with self.metrics.phase('io'):
+                        archive.writestr(self._get_member_name(filePath), text)
+                    self.metrics.count('documents')
+
+                # A zip archive cannot take other members while one is open for writing.
+                # So the .nwd files are written as they are rendered, and the project file last.
+                with self.metrics.phase('xml'):
+                    with io.StringIO() as f:
+                        self.write_project(XmlStreamWriter(f), self._generate_items(), write_document)
+                        xmlText = f.getvalue()
+                with self.metrics.phase('io'):
+                    archive.writestr(os.path.basename(self.filePath), xmlText.encode('utf-8', errors='xmlcharrefreplace'))
+                self._tree = None
+            if self._fsync:
+                sync_file(tempPath)
+            os.replace(tempPath, self.archivePath)
+            if self._fsync:
+                sync_dir(os.path.dirname(os.path.abspath(self.archivePath)))
+        except (OSError, Error):
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise Error(f'Can not write "{norm_path(self.archivePath)}".')
+
+        self.metrics.count('bytes', os.path.getsize(self.archivePath))
+
+    def _write_memory(self):
+        """Write the project file and the .nwd files into memoryFiles."""
+
+        def write_document(filePath, text):
+            self.memoryFiles[filePath] = text
+            self.metrics.count('documents')
+
+        self.memoryFiles.clear()
+        with self.metrics.phase('xml'):
+            with io.StringIO() as f:
+                self.write_project(XmlStreamWriter(f), self._generate_items(), write_document)
+                self.memoryFiles[self.filePath] = f.getvalue()
+        self._tree = None
+        self.metrics.count('bytes', sum(len(text.encode('utf-8')) for text in self.memoryFiles.values()))
+
+    def _get_member_name(self, filePath):
+        """Return the archive member name of a file in the project directory."""
+        return os.path.relpath(filePath, os.path.dirname(self.filePath)).replace('\\', '/')
+
+    @contextmanager
+    def _open_archive(self):
+        """Context manager opening the project archive for reading.
+        
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            self._archive = zipfile.ZipFile(self.archivePath)
+        except (OSError, zipfile.BadZipFile):
+            raise Error(f'Can not process "{norm_path(self.archivePath)}".')
+
+        try:
+            yield self._archive
+        finally:
+            self._archive.close()
+            self._archive = None
+
+    def _create_handle(self, element, text, suffix=''):
+        """Return a handle for a project item derived from element.
+        
+        Positional arguments:
+            element -- BasicElement instance represented by the item.
+            text -- str: string from which a new handle is derived.
+        
+        Optional arguments:
+            suffix -- str: distinguishes several items representing the same element, e.g. 'Folder'.
+        
+        If the node_id_handles option is set, derive new handles from the element's 
+        source node ID instead of text, so that they do not depend on the element order.
+        In incremental mode, reuse the handle assigned to the element's source node 
+        in the previous run, if possible.
+        """
+        with self.metrics.phase('handles'):
+            return self._get_handle(element, text, suffix)
+
+    def _get_handle(self, element, text, suffix):
+        """Return a handle for a project item derived from element; see _create_handle()."""
+        nodeId = element.kwVar.get(self.NODE_ID_KWVAR, None)
+        if nodeId is None:
+            return self.nwHandles.create_member(f'{text}{suffix}')
+
+        if self._nodeIdHandles:
+            text = f'{self.NODE_ID_KWVAR}{nodeId}'
+        if not self._incremental:
+            return self.nwHandles.create_member(f'{text}{suffix}')
+
+        nodeKey = f'{nodeId}{suffix}'
+        handle = self._state['nodes'].get(nodeKey, None)
+        if handle is None or not self.nwHandles.add_member(handle):
+            handle = self.nwHandles.create_member(f'{text}{suffix}')
+        self._newState['nodes'][nodeKey] = handle
+        return handle
+
+    def _hash_path(self):
+        """Return the path of the content hash manifest."""
+        return f'{os.path.dirname(self.filePath)}/{self.HASH_FILE}'
+
+    def _read_hashes(self):
+        """Read the content hash manifest of the previous run, if any."""
+        self._hashes = {}
+        try:
+            with open(self._hash_path(), 'r', encoding='utf-8') as f:
+                self._hashes = dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            # Start from scratch.
             pass
-        importance = ET.SubElement(settings, 'importance')
-        write_entry(importance, 'None', 220, 220, 220, self.IMPORTANCE_IDS)
-        write_entry(importance, 'Minor', 0, 122, 188, self.IMPORTANCE_IDS)
-        write_entry(importance, 'Major', 21, 0, 180, self.IMPORTANCE_IDS)
 
-        #--- Write content.
-        content = ET.SubElement(root, 'content')
-        attrCount = 0
+    def _read_state(self):
+        """Read the incremental conversion state of the previous run, if any."""
+        self._state = {'nodes': {}}
+        try:
+            with open(self._state_path(), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self._state['nodes'] = dict(state['nodes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Start from scratch.
+            pass
+
+    def _remove_orphans(self):
+        """Delete the .nwd files written in the previous run for items that no longer exist."""
+        contentDir = f'{os.path.dirname(self.filePath)}{self.CONTENT_DIR}'
+        for handle in self._hashes:
+            if not handle in self._newHashes:
+                try:
+                    os.remove(f'{contentDir}{handle}{self.CONTENT_EXTENSION}')
+                except OSError:
+                    pass
+
+    def _state_path(self):
+        """Return the path of the incremental conversion state file."""
+        return f'{os.path.dirname(self.filePath)}/{self.STATE_FILE}'
+
+    def _write_hashes(self):
+        """Write the content hash manifest of the current run."""
+        self._write_json(self._hash_path(), self._newHashes)
+
+    def _write_state(self):
+        """Write the incremental conversion state of the current run."""
+        self._write_json(self._state_path(), self._newState)
+
+    def _write_json(self, filePath, data):
+        """Write data to a JSON file, replacing the file only when complete.
+        
+        Positional arguments:
+            filePath -- str: path to the JSON file.
+            data -- dict: data to be written.
+        
+        Raise the "Error" exception in case of error.
+        """
+        tempPath = f'{filePath}.tmp'
+        try:
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            if self._fsync:
+                sync_file(tempPath)
+            os.replace(tempPath, filePath)
+        except OSError:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise Error(f'Can not write "{norm_path(filePath)}".')
+
+    def _count_items(self):
+        """Return the number of items to be written to the project's content section."""
+        count = 4
+        # Novel, character, world, and object root folders.
+        for chId in self.novel.srtChapters:
+            count += 2 + len(self.novel.chapters[chId].srtScenes)
+            # Folder and heading file of the part or chapter, and its scenes.
+        count += len(self.novel.srtCharacters) + len(self.novel.srtLocations) + len(self.novel.srtItems)
+        return count
+
+    def plan_items(self):
+        """Generate the project items in project order, without handles.
+        
+        Yield (kind, elementId, parentKey, order) tuples, where
+        kind -- str: item kind, e.g. 'chapterFolder' or 'scene'.
+        elementId -- str: ID of the novel element, or None for the root folders.
+        parentKey -- (kind, elementId) tuple of the parent folder, or None for the root folders.
+        order -- int: position within the parent folder.
+        """
         order = [0]
         # Use a list as a stack for the order within a level
 
-        #--- Write novel folder.
-        novelFolderHandle = self.nwHandles.create_member('novelFolderHandle')
-        novelFolder = NwItem()
-        novelFolder.nwHandle = novelFolderHandle
-        novelFolder.nwOrder = order[-1]
-        novelFolder.nwParent = 'None'
-        novelFolder.nwName = 'Novel'
-        novelFolder.nwType = 'ROOT'
-        novelFolder.nwClass = 'NOVEL'
-        novelFolder.nwExpanded = 'True'
-        novelFolder.write(content, self)
-        attrCount += 1
+        #--- Plan novel folder.
+        novelFolderKey = ('novelFolder', None)
+        yield 'novelFolder', None, None, order[-1]
         order[-1] += 1
         # content level
         hasPartLevel = False
@@ -306,47 +697,16 @@ class NwxFile(File):
                 hasPartLevel = True
                 isInChapter = False
 
-                #--- Write a new folder for this part.
-                partFolderHandle = self.nwHandles.create_member(f'{chId + self.novel.chapters[chId].title}Folder')
-                partFolder = NwItem()
-                partFolder.nwHandle = partFolderHandle
-                partFolder.nwOrder = order[-1]
-                partFolder.nwParent = novelFolderHandle
-                partFolder.nwName = self.novel.chapters[chId].title
-                partFolder.nwType = 'FOLDER'
-                partFolder.nwClass = 'NOVEL'
-                partFolder.expanded = 'True'
-                partFolder.write(content, self)
-                attrCount += 1
+                #--- Plan a new folder for this part.
+                partFolderKey = ('partFolder', chId)
+                yield 'partFolder', chId, novelFolderKey, order[-1]
                 order[-1] += 1
                 # novel level
                 order.append(0)
                 # Level up from novel to part
 
                 # Put the heading into the part folder.
-                partHeadingHandle = self.nwHandles.create_member(f'{chId + self.novel.chapters[chId].title}')
-                partHeading = NwItem()
-                partHeading.nwHandle = partHeadingHandle
-                partHeading.nwOrder = order[-1]
-                partHeading.nwParent = partFolderHandle
-                partHeading.nwName = self.novel.chapters[chId].title
-                partHeading.nwType = 'FILE'
-                partHeading.nwClass = 'NOVEL'
-                partHeading.nwLayout = 'DOCUMENT'
-                partHeading.nwActive = True
-                if self.novel.chapters[chId].chType == 3:
-                    partHeading.nwActive = False
-                elif self.novel.chapters[chId].chType in (1, 2):
-                    partHeading.nwLayout = 'NOTE'
-                partHeading.nwStatus = 'None'
-                partHeading.nwImportance = 'None'
-                partHeading.write(content, self)
-
-                # Add it to the .nwd file.
-                nwdFile = NwdNovelFile(self, partHeading)
-                nwdFile.add_chapter(chId)
-                nwdFile.write()
-                attrCount += 1
+                yield 'partHeading', chId, partFolderKey, order[-1]
                 order[-1] += 1
                 # part level
 
@@ -356,91 +716,27 @@ class NwxFile(File):
                 # Begin with a new chapter.
                 isInChapter = True
 
-                #--- Write a new folder for this chapter.
-                chapterFolderHandle = self.nwHandles.create_member(f'{chId}{self.novel.chapters[chId].title}Folder')
-                chapterFolder = NwItem()
-                chapterFolder.nwHandle = chapterFolderHandle
-                chapterFolder.nwOrder = order[-1]
+                #--- Plan a new folder for this chapter.
+                chapterFolderKey = ('chapterFolder', chId)
                 if hasPartLevel:
-                    chapterFolder.nwParent = partFolderHandle
+                    yield 'chapterFolder', chId, partFolderKey, order[-1]
                 else:
-                    chapterFolder.nwParent = novelFolderHandle
-                chapterFolder.nwName = self.novel.chapters[chId].title
-                chapterFolder.nwType = 'FOLDER'
-                chapterFolder.expanded = 'True'
-                chapterFolder.write(content, self)
-                attrCount += 1
+                    yield 'chapterFolder', chId, novelFolderKey, order[-1]
                 order[-1] += 1
                 # part or novel level
                 order.append(0)
                 # Level up from part or novel to chapter
 
                 # Put the heading into the folder.
-                chapterHeadingHandle = self.nwHandles.create_member(f'{chId}{self.novel.chapters[chId].title}')
-                chapterHeading = NwItem()
-                chapterHeading.nwHandle = chapterHeadingHandle
-                chapterHeading.nwOrder = order[-1]
-                chapterHeading.nwParent = chapterFolderHandle
-                chapterHeading.nwName = self.novel.chapters[chId].title
-                chapterHeading.nwType = 'FILE'
-                chapterHeading.nwClass = 'NOVEL'
-                chapterHeading.nwLayout = 'DOCUMENT'
-                chapterHeading.nwActive = True
-                if self.novel.chapters[chId].chType == 3:
-                    chapterHeading.nwActive = False
-                elif self.novel.chapters[chId].chType in (1, 2):
-                    chapterHeading.nwLayout = 'NOTE'
-                chapterHeading.nwStatus = 'None'
-                chapterHeading.nwImportance = 'None'
-                chapterHeading.write(content, self)
-
-                # Add it to the .nwd file.
-                nwdFile = NwdNovelFile(self, chapterHeading)
-                nwdFile.add_chapter(chId)
-                nwdFile.write()
-                attrCount += 1
+                yield 'chapterHeading', chId, chapterFolderKey, order[-1]
                 order[-1] += 1
                 # chapter level
             for scId in self.novel.chapters[chId].srtScenes:
                 #--- Put a scene into the folder.
-                sceneHandle = self.nwHandles.create_member(f'{scId}{self.novel.scenes[scId].title}')
-                scene = NwItem()
-                scene.nwHandle = sceneHandle
-                scene.nwOrder = order[-1]
                 if isInChapter:
-                    scene.nwParent = chapterFolderHandle
-                else:
-                    scene.nwParent = partFolderHandle
-                if self.novel.scenes[scId].title:
-                    title = self.novel.scenes[scId].title
+                    yield 'scene', scId, chapterFolderKey, order[-1]
                 else:
-                    title = f'Scene {order[-1] + 1}'
-                scene.nwName = title
-                scene.nwType = 'FILE'
-                scene.nwClass = 'NOVEL'
-                if self.novel.scenes[scId].status is not None:
-                    try:
-                        scene.nwStatus = self._sceneStatus[self.novel.scenes[scId].status]
-                    except IndexError:
-                        scene.nwStatus = self._sceneStatus[-1]
-                scene.nwImportance = 'None'
-                scene.nwLayout = 'DOCUMENT'
-                scene.nwActive = True
-                if self.novel.scenes[scId].scType == 3:
-                    scene.nwActive = False
-                elif self.novel.scenes[scId].scType in (1, 2):
-                    scene.nwLayout = 'NOTE'
-                if self.novel.scenes[scId].wordCount:
-                    scene.nwWordCount = str(self.novel.scenes[scId].wordCount)
-                if self.novel.scenes[scId].letterCount:
-                    scene.nwCharCount = str(self.novel.scenes[scId].letterCount)
-                scene.write(content, self)
-
-                # Add it to the .nwd file.
-                nwdFile = NwdNovelFile(self, scene)
-                nwdFile.add_scene(scId)
-                nwdFile.write()
-                attrCount += 1
+                    yield 'scene', scId, partFolderKey, order[-1]
                 order[-1] += 1
                 # chapter or part level
             order.pop()
@@ -448,165 +744,322 @@ class NwxFile(File):
         order.pop()
         # Level down from novel to content
 
-        #--- Write character folder.
-        characterFolderHandle = self.nwHandles.create_member('characterFolderHandle')
-        characterFolder = NwItem()
-        characterFolder.nwHandle = characterFolderHandle
-        characterFolder.nwOrder = order[-1]
-        characterFolder.nwParent = 'None'
-        characterFolder.nwName = 'Characters'
-        characterFolder.nwType = 'ROOT'
-        characterFolder.nwClass = 'CHARACTER'
-        characterFolder.nwStatus = 'None'
-        characterFolder.nwImportance = 'None'
-        characterFolder.nwExpanded = 'True'
-        characterFolder.write(content, self)
-        attrCount += 1
-        order[-1] += 1
+        #--- Plan the world building folders and their items.
+        for folderKind, itemKind, srtIds in (
+                ('characterFolder', 'character', self.novel.srtCharacters),
+                ('worldFolder', 'location', self.novel.srtLocations),
+                ('objectFolder', 'item', self.novel.srtItems),
+                ):
+            yield folderKind, None, None, order[-1]
+            order[-1] += 1
+            # content level
+            order.append(0)
+            # Level up from content to the folder
+            for elemId in srtIds:
+                yield itemKind, elemId, (folderKind, None), order[-1]
+                order[-1] += 1
+                # folder level
+            order.pop()
+            # Level down from the folder to content
 
-        # Add character items to the folder.
-        order.append(0)
-        # Level up from world to character
-        for crId in self.novel.srtCharacters:
-            #--- Put a character into the folder.
-            characterHandle = self.nwHandles.create_member(f'{crId}{self.novel.characters[crId].title}')
-            character = NwItem()
-            character.nwHandle = characterHandle
-            character.nwOrder = order[-1]
-            character.nwParent = characterFolderHandle
-            if self.novel.characters[crId].fullName:
-                character.nwName = self.novel.characters[crId].fullName
-            elif self.novel.characters[crId].title:
-                character.nwName = self.novel.characters[crId].title
-            else:
-                character.nwName = f'Character {order[-1] + 1}'
-            character.nwType = 'FILE'
-            character.nwClass = 'CHARACTER'
-            character.nwStatus = 'None'
-            if self.novel.characters[crId].isMajor:
-                character.nwImportance = 'Major'
+    def assign_handles(self, plans):
+        """Generate the project items with handles, one per planned item.
+        
+        Positional arguments:
+            plans -- iterable of (kind, elementId, parentKey, order) tuples, as generated by plan_items().
+        
+        Yield (kind, elementId, nwItem) tuples, where nwItem is a NwItemV15 instance.
+        The handles are created in the order of the plans.
+        """
+        folderHandles = {}
+        # key: (kind, elementId) tuple of a folder, value: handle.
+        for kind, elemId, parentKey, order in plans:
+            nwItem = self._create_item(kind, elemId, order)
+            if parentKey is None:
+                nwItem.nwParent = 'None'
             else:
-                character.nwImportance = 'Minor'
-            character.nwActive = True
-            character.nwLayout = 'NOTE'
-            character.write(content, self)
+                nwItem.nwParent = folderHandles[parentKey]
+            if kind.endswith('Folder'):
+                folderHandles[(kind, elemId)] = nwItem.nwHandle
+            yield kind, elemId, nwItem
 
-            # Add it to the .nwd file.
-            nwdFile = NwdCharacterFile(self, character)
-            nwdFile.add_character(crId)
-            nwdFile.write()
+    def render_documents(self, items):
+        """Generate the project items with the rendered text of their .nwd files.
+        
+        Positional arguments:
+            items -- iterable of (kind, elementId, nwItem) tuples, as generated by assign_handles().
+        
+        Yield (nwItem, document) tuples, where document is a (file path, text) tuple, 
+        or None for folders.
+        """
+        for kind, elemId, nwItem in items:
+            nwdType = self._NWD_TYPES.get(kind, None)
+            if nwdType is None:
+                yield nwItem, None
+                continue
 
-            attrCount += 1
-            order[-1] += 1
-            # character level
-        order.pop()
-        # Level down from character to content
-
-        #--- Write world folder.
-        worldFolderHandle = self.nwHandles.create_member('worldFolderHandle')
-        worldFolder = NwItem()
-        worldFolder.nwHandle = worldFolderHandle
-        worldFolder.nwOrder = order[-1]
-        worldFolder.nwParent = 'None'
-        worldFolder.nwName = 'Locations'
-        worldFolder.nwType = 'ROOT'
-        worldFolder.nwClass = 'WORLD'
-        worldFolder.nwStatus = 'None'
-        worldFolder.nwImportance = 'None'
-        worldFolder.nwExpanded = 'True'
-        worldFolder.write(content, self)
-        attrCount += 1
-        order[-1] += 1
-        # content level
+            nwdClass, addElement = nwdType
+            with self.metrics.phase('rendering'):
+                nwdFile = nwdClass(self, nwItem)
+                getattr(nwdFile, addElement)(elemId)
+                text = nwdFile.render()
+            yield nwItem, (nwdFile.filePath, text)
 
-        # Add world items to the folder.
-        order.append(0)
-        # Level up from content to world
-        for lcId in self.novel.srtLocations:
-            #--- Put a location into the folder.
-            locationHandle = self.nwHandles.create_member(f'{lcId}{self.novel.locations[lcId].title}')
-            location = NwItem()
-            location.nwHandle = locationHandle
-            location.nwOrder = order[-1]
-            location.nwParent = worldFolderHandle
-            if self.novel.locations[lcId].title:
-                title = self.novel.locations[lcId].title
-            else:
-                title = f'Place {order[-1] + 1}'
-            location.nwName = title
-            location.nwType = 'FILE'
-            location.nwClass = 'WORLD'
-            location.nwActive = True
-            location.nwLayout = 'NOTE'
-            location.nwStatus = 'None'
-            location.nwImportance = 'None'
-            location.write(content, self)
-
-            # Add it to the .nwd file.
-            nwdFile = NwdWorldFile(self, location)
-            nwdFile.add_element(lcId)
-            nwdFile.write()
-            attrCount += 1
-            order[-1] += 1
-            # world level
-        order.pop()
-        # Level down from world to to content
-
-        #--- Write object folder.
-        objectFolderHandle = self.nwHandles.create_member('objectFolderHandle')
-        objectFolder = NwItem()
-        objectFolder.nwHandle = objectFolderHandle
-        objectFolder.nwOrder = order[-1]
-        objectFolder.nwParent = 'None'
-        objectFolder.nwName = 'Items'
-        objectFolder.nwType = 'ROOT'
-        objectFolder.nwClass = 'OBJECT'
-        objectFolder.nwStatus = 'None'
-        objectFolder.nwImportance = 'None'
-        objectFolder.nwExpanded = 'True'
-        objectFolder.write(content, self)
-        attrCount += 1
-        order[-1] += 1
-        # content level
+    def _generate_items(self):
+        """Return the complete item pipeline: planning, handle assignment, and rendering."""
+        return self.render_documents(self.assign_handles(self.plan_items()))
 
-        # Add object items to the folder.
-        order.append(0)
-        # Level up from content to object
-        for itId in self.novel.srtItems:
-            #--- Put a item into the folder.
-            itemHandle = self.nwHandles.create_member(f'{itId}{self.novel.items[itId].title}')
-            item = NwItem()
-            item.nwHandle = itemHandle
-            item.nwOrder = order[-1]
-            item.nwParent = objectFolderHandle
-            if self.novel.items[itId].title:
-                title = self.novel.items[itId].title
+    def _create_item(self, kind, elemId, order):
+        """Return a new NwItemV15 instance with a handle, but without parent.
+        
+        Positional arguments:
+            kind -- str: item kind, as planned by plan_items().
+            elemId -- str: ID of the novel element, or None for the root folders.
+            order -- int: position within the parent folder.
+        """
+        nwItem = NwItemV15()
+        nwItem.nwOrder = order
+        if kind == 'novelFolder':
+            nwItem.nwHandle = self.nwHandles.create_member('novelFolderHandle')
+            nwItem.nwName = 'Novel'
+            nwItem.nwType = 'ROOT'
+            nwItem.nwClass = 'NOVEL'
+            nwItem.nwExpanded = 'True'
+        elif kind == 'partFolder':
+            chapter = self.novel.chapters[elemId]
+            nwItem.nwHandle = self._create_handle(chapter, f'{elemId + chapter.title}', 'Folder')
+            nwItem.nwName = chapter.title
+            nwItem.nwType = 'FOLDER'
+            nwItem.nwClass = 'NOVEL'
+            nwItem.expanded = 'True'
+        elif kind == 'chapterFolder':
+            chapter = self.novel.chapters[elemId]
+            nwItem.nwHandle = self._create_handle(chapter, f'{elemId}{chapter.title}', 'Folder')
+            nwItem.nwName = chapter.title
+            nwItem.nwType = 'FOLDER'
+            nwItem.expanded = 'True'
+        elif kind in ('partHeading', 'chapterHeading'):
+            chapter = self.novel.chapters[elemId]
+            if kind == 'partHeading':
+                nwItem.nwHandle = self._create_handle(chapter, f'{elemId + chapter.title}')
             else:
-                title = f'Object {order[-1] + 1}'
-            item.nwName = title
-            item.nwType = 'FILE'
-            item.nwClass = 'OBJECT'
-            item.nwActive = True
-            item.nwLayout = 'NOTE'
-            item.nwStatus = 'None'
-            item.nwImportance = 'None'
-            item.write(content, self)
-
-            # Add it to the .nwd file.
-            nwdFile = NwdObjectFile(self, item)
-            nwdFile.add_element(itId)
-            nwdFile.write()
-            attrCount += 1
-            order[-1] += 1
-            # object level
-        order.pop()
-        # Level down from object to to content
+                nwItem.nwHandle = self._create_handle(chapter, f'{elemId}{chapter.title}')
+            nwItem.nwName = chapter.title
+            nwItem.nwType = 'FILE'
+            nwItem.nwClass = 'NOVEL'
+            nwItem.nwLayout = 'DOCUMENT'
+            nwItem.nwActive = True
+            if chapter.chType == 3:
+                nwItem.nwActive = False
+            elif chapter.chType in (1, 2):
+                nwItem.nwLayout = 'NOTE'
+            nwItem.nwStatus = 'None'
+            nwItem.nwImportance = 'None'
+        elif kind == 'scene':
+            scene = self.novel.scenes[elemId]
+            nwItem.nwHandle = self._create_handle(scene, f'{elemId}{scene.title}')
+            self.metrics.count('scenes')
+            self.metrics.count('words', scene.wordCount or 0)
+            if scene.title:
+                nwItem.nwName = scene.title
+            else:
+                nwItem.nwName = f'Scene {order + 1}'
+            nwItem.nwType = 'FILE'
+            nwItem.nwClass = 'NOVEL'
+            if scene.status is not None:
+                try:
+                    nwItem.nwStatus = self._sceneStatus[scene.status]
+                except IndexError:
+                    nwItem.nwStatus = self._sceneStatus[-1]
+            nwItem.nwImportance = 'None'
+            nwItem.nwLayout = 'DOCUMENT'
+            nwItem.nwActive = True
+            if scene.scType == 3:
+                nwItem.nwActive = False
+            elif scene.scType in (1, 2):
+                nwItem.nwLayout = 'NOTE'
+            if scene.wordCount:
+                nwItem.nwWordCount = str(scene.wordCount)
+            if scene.letterCount:
+                nwItem.nwCharCount = str(scene.letterCount)
+        elif kind in ('characterFolder', 'worldFolder', 'objectFolder'):
+            nwItem.nwHandle = self.nwHandles.create_member(f'{kind}Handle')
+            nwItem.nwName, nwItem.nwClass = self._ROOT_FOLDERS[kind]
+            nwItem.nwType = 'ROOT'
+            nwItem.nwStatus = 'None'
+            nwItem.nwImportance = 'None'
+            nwItem.nwExpanded = 'True'
+        elif kind == 'character':
+            character = self.novel.characters[elemId]
+            nwItem.nwHandle = self._create_handle(character, f'{elemId}{character.title}')
+            if character.fullName:
+                nwItem.nwName = character.fullName
+            elif character.title:
+                nwItem.nwName = character.title
+            else:
+                nwItem.nwName = f'Character {order + 1}'
+            nwItem.nwType = 'FILE'
+            nwItem.nwClass = 'CHARACTER'
+            nwItem.nwStatus = 'None'
+            if character.isMajor:
+                nwItem.nwImportance = 'Major'
+            else:
+                nwItem.nwImportance = 'Minor'
+            nwItem.nwActive = True
+            nwItem.nwLayout = 'NOTE'
+        elif kind in ('location', 'item'):
+            if kind == 'location':
+                element = self.novel.locations[elemId]
+                defaultTitle = 'Place'
+                nwItem.nwClass = 'WORLD'
+            else:
+                element = self.novel.items[elemId]
+                defaultTitle = 'Object'
+                nwItem.nwClass = 'OBJECT'
+            nwItem.nwHandle = self._create_handle(element, f'{elemId}{element.title}')
+            if element.title:
+                nwItem.nwName = element.title
+            else:
+                nwItem.nwName = f'{defaultTitle} {order + 1}'
+            nwItem.nwType = 'FILE'
+            nwItem.nwActive = True
+            nwItem.nwLayout = 'NOTE'
+            nwItem.nwStatus = 'None'
+            nwItem.nwImportance = 'None'
+        return nwItem
 
-        # Write the content counter.
-        content.set('count', str(attrCount))
+    def write_project(self, xmlWriter, items, write_document):
+        """Write the XML project file element by element, passing on each .nwd file.
+        
+        Positional arguments:
+            xmlWriter -- XmlStreamWriter instance.
+            items -- iterable of (nwItem, document) tuples, as generated by render_documents().
+            write_document -- function taking the file path and the text of a .nwd file.
+        
+        The items are consumed one at a time, so each .nwd file is passed on as soon as it is rendered.
+        write() uses this method for the project directory, the archive, and the in-memory mode;
+        call it directly in order to pass the documents to another sink.
+        """
+
+        def write_entry(entry, red, green, blue, map):
+            """Write an XML entry with RGB values as attributes.
+            """
+            attrib = {}
+            attrib['key'] = map[entry]
+            attrib['count'] = '0'
+            attrib['blue'] = str(blue)
+            attrib['green'] = str(green)
+            attrib['red'] = str(red)
+            xmlEntry = ET.Element('entry', attrib)
+            xmlEntry.text = entry
+            xmlWriter.write_element(xmlEntry)
+
+        xmlWriter.write_declaration()
+        xmlWriter.start(self._NWX_TAG, self._NWX_ATTR_V1_5)
+
+        #--- Write project metadata.
+        xmlPrj = ET.Element('project')
+        if self.novel.title:
+            title = self.novel.title
+        else:
+            title = 'New project'
+        ET.SubElement(xmlPrj, 'name').text = title
+        ET.SubElement(xmlPrj, 'title').text = title
+        if self.novel.authorName:
+            authors = self.novel.authorName.split(',')
+        else:
+            authors = ['']
+        for author in authors:
+            ET.SubElement(xmlPrj, 'author').text = author.strip()
+        xmlWriter.write_element(xmlPrj)
+
+        #--- Write settings.
+        xmlWriter.start('settings')
+        xmlWriter.start('status')
+        try:
+            write_entry(self._sceneStatus[0], 230, 230, 230, self.STATUS_IDS)
+            write_entry(self._sceneStatus[1], 0, 0, 0, self.STATUS_IDS)
+            write_entry(self._sceneStatus[2], 170, 40, 0, self.STATUS_IDS)
+            write_entry(self._sceneStatus[3], 240, 140, 0, self.STATUS_IDS)
+            write_entry(self._sceneStatus[4], 250, 190, 90, self.STATUS_IDS)
+            write_entry(self._sceneStatus[5], 58, 180, 58, self.STATUS_IDS)
+        except IndexError:
+            pass
+        xmlWriter.end()
+        xmlWriter.start('importance')
+        write_entry('None', 220, 220, 220, self.IMPORTANCE_IDS)
+        write_entry('Minor', 0, 122, 188, self.IMPORTANCE_IDS)
+        write_entry('Major', 21, 0, 180, self.IMPORTANCE_IDS)
+        xmlWriter.end()
+        xmlWriter.end()
+
+        #--- Write content.
+        xmlWriter.start('content', {'count': str(self._count_items())})
+        for nwItem, document in items:
+            xmlWriter.write_element(nwItem.write(ET.Element('content'), self))
+            self.metrics.count('items')
+            if document is not None:
+                write_document(*document)
+        xmlWriter.end()
+        # Close the content section.
+        xmlWriter.end()
+        # Close the root element.
+
+    @contextmanager
+    def _document_writer(self):
+        """Context manager providing a function that writes a .nwd file to the project directory.
+        
+        The function skips unchanged files in skip_unchanged or incremental mode.
+        If the write_threads option is greater than 1, the files are written by a thread pool, 
+        with a bounded number of files waiting. Leaving the context waits for all files.
+        In case of error, raise the "Error" exception for the first document 
+        in project order that could not be written.
+        """
+
+        def is_unchanged(filePath, text):
+            """Return True if the file's content is unchanged since the last run."""
+            if not self._skipUnchanged:
+                return False
+
+            handle = os.path.basename(filePath)[:-len(self.CONTENT_EXTENSION)]
+            contentHash = sha1(text.encode('utf-8')).hexdigest()
+            self._newHashes[handle] = contentHash
+            if self._hashes.get(handle, None) == contentHash and os.path.isfile(filePath):
+                self.metrics.count('skippedDocuments')
+                return True
+
+            return False
+
+        def write_document(filePath, text):
+            if is_unchanged(filePath, text):
+                return
+
+            self.metrics.count('documents')
+            self.metrics.count('bytes', len(text.encode('utf-8')))
+            with self.metrics.phase('io'):
+                self.write_document(filePath, text)
+
+        if self._writeThreads <= 1:
+            yield write_document
+            return
+
+        def submit_document(filePath, text):
+            if is_unchanged(filePath, text):
+                return
+
+            self.metrics.count('documents')
+            self.metrics.count('bytes', len(text.encode('utf-8')))
+            if len(pending) >= maxPending:
+                with self.metrics.phase('io'):
+                    pending.popleft().result()
+            pending.append(executor.submit(self.write_document, filePath, text))
+
+        pending = deque()
+        # Futures of the files being written, in project order.
+        maxPending = self._writeThreads * 4
+        with ThreadPoolExecutor(max_workers=self._writeThreads) as executor:
+            yield submit_document
+            with self.metrics.phase('io'):
+                while pending:
+                    pending.popleft().result()
 
-        #--- Format and write the XML tree.
-        indent(root)
-        self._tree = ET.ElementTree(root)
-        self._tree.write(self.filePath, xml_declaration=True, encoding='utf-8')
-        return f'"{norm_path(self.filePath)}" written.'
@@ -0,0 +1,215 @@
+<map version="1.0.1">
+<!-- To view this file, download free mind mapping software FreeMind from http://freemind.sourceforge.net -->
+<node CREATED="1685823953355" ID="ID_678784683" MODIFIED="1685906303848" TEXT="Roman">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Mein toller Roman.
+    </p>
+  </body>
+</html></richcontent>
+<hook NAME="MapStyle">
+<properties EDGECOLORCONFIGURATION="#808080ff,#ff0000ff,#0000ffff,#00ff00ff,#ff00ffff,#00ffffff,#7c0000ff,#00007cff,#007c00ff,#7c007cff,#007c7cff,#7c7c00ff" FIT_TO_VIEWPORT="false" SHOW_ICON_FOR_ATTRIBUTES="true" SHOW_NOTE_ICONS="true"/>
+<map_styles>
+<stylenode LOCALIZED_TEXT="styles.root_node" STYLE="oval" UNIFORM_SHAPE="true" VGAP_QUANTITY="24 pt">
+<font/>
+<stylenode LOCALIZED_TEXT="styles.predefined" POSITION="right" STYLE="bubble">
+<stylenode COLOR="#000000" ICON_SIZE="12 pt" ID="ID_271890427" LOCALIZED_TEXT="default" STYLE="fork">
+<arrowlink/>
+<font/>
+<richcontent CONTENT-TYPE="plain/auto" TYPE="DETAILS"/>
+<richcontent CONTENT-TYPE="plain/auto" TYPE="NOTE"/>
+</stylenode>
+<stylenode LOCALIZED_TEXT="defaultstyle.details"/>
+<stylenode LOCALIZED_TEXT="defaultstyle.attributes">
+<font/>
+</stylenode>
+<stylenode BACKGROUND_COLOR="#ffffff" COLOR="#000000" LOCALIZED_TEXT="defaultstyle.note" TEXT_ALIGN="LEFT"/>
+<stylenode LOCALIZED_TEXT="defaultstyle.floating">
+<edge/>
+<cloud/>
+</stylenode>
+<stylenode BACKGROUND_COLOR="#4e85f8" BORDER_COLOR="#4e85f8" BORDER_COLOR_LIKE_EDGE="false" LOCALIZED_TEXT="defaultstyle.selection" STYLE="bubble"/>
+</stylenode>
+<stylenode LOCALIZED_TEXT="styles.user-defined" POSITION="right" STYLE="bubble">
+<stylenode COLOR="#18898b" LOCALIZED_TEXT="styles.topic" STYLE="fork">
+<font/>
+</stylenode>
+<stylenode COLOR="#cc3300" LOCALIZED_TEXT="styles.subtopic" STYLE="fork">
+<font/>
+</stylenode>
+<stylenode COLOR="#669900" LOCALIZED_TEXT="styles.subsubtopic">
+<font/>
+</stylenode>
+<stylenode ID="ID_67550811" LOCALIZED_TEXT="styles.important">
+<icon/>
+<arrowlink/>
+</stylenode>
+</stylenode>
+<stylenode LOCALIZED_TEXT="styles.AutomaticLayout" POSITION="right" STYLE="bubble">
+<stylenode COLOR="#000000" LOCALIZED_TEXT="AutomaticLayout.level.root" SHAPE_HORIZONTAL_MARGIN="10 pt" SHAPE_VERTICAL_MARGIN="10 pt" STYLE="oval">
+<font/>
+</stylenode>
+<stylenode COLOR="#0033ff" LOCALIZED_TEXT="AutomaticLayout.level,1">
+<font/>
+</stylenode>
+<stylenode COLOR="#00b439" LOCALIZED_TEXT="AutomaticLayout.level,2">
+<font/>
+</stylenode>
+<stylenode COLOR="#990000" LOCALIZED_TEXT="AutomaticLayout.level,3">
+<font/>
+</stylenode>
+<stylenode COLOR="#111111" LOCALIZED_TEXT="AutomaticLayout.level,4">
+<font/>
+</stylenode>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,5"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,6"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,7"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,8"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,9"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,10"/>
+<stylenode LOCALIZED_TEXT="AutomaticLayout.level,11"/>
+</stylenode>
+</stylenode>
+</map_styles>
+</hook>
+<node CREATED="1685823968046" ID="ID_1245095957" MODIFIED="1685882843117" POSITION="right" TEXT="Erster Teil">
+<node CREATED="1685824056049" ID="ID_1059238039" MODIFIED="1685824281992" TEXT="Erstes kapitel">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Beschreibung Kapitel 1
+    </p>
+  </body>
+</html></richcontent>
+<node CREATED="1685824105136" ID="ID_938429850" MODIFIED="1685906462734">
+<richcontent TYPE="NODE"><html>
+  <head>
+    
+  </head>
+  <body>
+    Erste Szene
+  </body>
+</html></richcontent>
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Beschreibung   <b>Szene</b>
+      <i>eins</i>.
+    </p>
+    <ul>
+      <li>
+        Erster <b><i>Punkt</i></b>
+      </li>
+      <li>
+        Zweiter Punkt
+      </li>
+    </ul>
+    <pre>
+Zeile 1
+Zeile 2</pre>
+  </body>
+</html></richcontent>
+</node>
+<node CREATED="1685824108871" ID="ID_1115791131" MODIFIED="1685824273658" TEXT="Zweite Szene">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Beschreibung Szene 2
+    </p>
+  </body>
+</html></richcontent>
+</node>
+<node CREATED="1685824113134" ID="ID_419951816" MODIFIED="1685907844256" TEXT="Dritte Szene"/>
+</node>
+<node CREATED="1685824062007" ID="ID_169847409" MODIFIED="1685824067476" TEXT="Zweites Kapitel">
+<node CREATED="1685824119047" ID="ID_291842500" MODIFIED="1685907937061" TEXT="vierte Szene">
+<icon BUILTIN="info"/>
+</node>
+<node CREATED="1685824123166" ID="ID_1374714061" MODIFIED="1685907976715" TEXT="f&#xfc;nfte Szene">
+<icon BUILTIN="list"/>
+</node>
+</node>
+</node>
+<node CREATED="1685823976248" ID="ID_1403483922" MODIFIED="1685912318592" POSITION="right" TEXT="Zweiter Teil">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Beschreibung Teil 2
+    </p>
+  </body>
+</html></richcontent>
+<icon BUILTIN="list"/>
+<node CREATED="1685824076289" ID="ID_298643886" MODIFIED="1685824081652" TEXT="Drittes Kapitel">
+<node CREATED="1685824131480" ID="ID_1698629990" MODIFIED="1685824136667" TEXT="Sechste Szene"/>
+<node CREATED="1685824137280" ID="ID_1214950216" MODIFIED="1685824140859" TEXT="Siebte Szene"/>
+<node CREATED="1685824141126" ID="ID_808972548" MODIFIED="1685824144412" TEXT="Achte Szene"/>
+</node>
+<node CREATED="1685824082096" ID="ID_1943561550" MODIFIED="1685824086492" TEXT="Viertes Kapitel">
+<node CREATED="1685824146208" ID="ID_1334444493" MODIFIED="1685824150172" TEXT="Neunte Szene"/>
+<node CREATED="1685824150806" ID="ID_1711774220" MODIFIED="1685824157675" TEXT="Zehnte Szene"/>
+</node>
+</node>
+<node CREATED="1685823980768" ID="ID_1408404280" MODIFIED="1685911774250" POSITION="right" TEXT="Dritter Teil">
+<icon BUILTIN="info"/>
+<node CREATED="1685824090960" ID="ID_1626066415" MODIFIED="1685824098332" TEXT="F&#xfc;nftes kapitel"/>
+<node CREATED="1685824098791" ID="ID_858938399" MODIFIED="1685824102804" TEXT="Sechstes Kapitel"/>
+</node>
+<node CREATED="1685882849895" FOLDED="true" ID="ID_848831873" MODIFIED="1685947926542" POSITION="left" TEXT="Main characters">
+<icon BUILTIN="full-1"/>
+<node CREATED="1685882987381" ID="ID_797707645" MODIFIED="1685883002728" TEXT="Pyramus"/>
+<node CREATED="1685883003283" ID="ID_702987217" MODIFIED="1685883005760" TEXT="Thisbe"/>
+</node>
+<node CREATED="1685947883068" ID="ID_1620630770" MODIFIED="1685947907607" POSITION="left" TEXT="Minor characters">
+<icon BUILTIN="full-2"/>
+<node CREATED="1685947890132" ID="ID_1412638057" MODIFIED="1685947896735" TEXT="Der G&#xe4;rtner"/>
+<node CREATED="1685947897338" ID="ID_962166988" MODIFIED="1685947902246" TEXT="Der butler"/>
+</node>
+<node CREATED="1685882857405" ID="ID_927216111" MODIFIED="1685882907539" POSITION="left" TEXT="Locations">
+<icon BUILTIN="gohome"/>
+<node CREATED="1685883010260" ID="ID_1125608536" MODIFIED="1685883012496" TEXT="Hades"/>
+<node CREATED="1685883013035" ID="ID_1401103151" MODIFIED="1685906349126" TEXT="Olymp">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Sitz der G&#xf6;tter.
+    </p>
+  </body>
+</html></richcontent>
+</node>
+</node>
+<node CREATED="1685882861581" ID="ID_919606540" MODIFIED="1685882972242" POSITION="left" TEXT="Items">
+<icon BUILTIN="password"/>
+<node CREATED="1685883019827" ID="ID_1806341438" MODIFIED="1685906318674" TEXT="Stab">
+<richcontent TYPE="NOTE"><html>
+  <head>
+    
+  </head>
+  <body>
+    <p>
+      Wanderstab mit h&#xfc;bschen Schnitzereien.
+    </p>
+  </body>
+</html></richcontent>
+</node>
+</node>
+</node>
+</map>